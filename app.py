@@ -1,21 +1,52 @@
 import manimlib
 from manimlib import *
 
+import os
 import sys
+import numpy as np
 sys.path.insert(1, '.')
 
+from cycle_detection import CycleDetector
 from life_game import Life
+from engines import create_life
+from profiling import phase, profiled
+from raster_grid import RasterGrid
+from timeline_cache import Timeline, TimelineCache
 
 CUSTOM_WHITE = '#ecf0f1'
 _BLACK_OPACITY = 0.6
+# a dead cell of a RasterGrid: black with _BLACK_OPACITY over the background
+RASTER_DEAD_COLOR = '#5e6060'
 TITLE_FONT_SIZE = 60
 BODY_FONT_SIZE = 30
 TITLE_BODY_BUFFER = 0.4
 FONT_FAMILY = 'Poppins'
 # FONT_FAMILY = 'Verdana'
+# which engine from engines.py computes the generations: 'list', 'numpy', 'sparse', 'hash' or 'bit'
+ENGINE = 'list'
+# the rule of the simulation, see rules.py. the scenes explain B3/S23, the Game of Life
+RULE = 'B3/S23'
+# what is outside of the edges of the board, see boundary.py. e.g. on a 'torus' the gliders wrap around
+# instead of piling up against the edges
+BOUNDARY = 'dead'
+# simulated generations are cached here, so a re-render with other texts or timings replays them.
+# None to always simulate
+TIMELINE_CACHE = TimelineCache('./temp_storage/timelines')
+# opt-in instrumentation, see profiling.py: prints where the time of every scene went at the end of construct.
+# e.g. profiling.Profiler(cprofile_dir='./temp_storage/profiles', trace_allocations=True). None for no overhead
+PROFILER = None
+
+# the sections of AppLife, in order. each one starts from a cleared screen, so they can be rendered
+# by separate processes and joined, see render_sections.py
+SECTIONS = ('opening', 'complexity', 'r_pentomino', 'still_life', 'oscillators', 'glider_gun', 'copperhead', 'question')
+# environment variable with the comma separated sections to render, all of them when it isn't set
+SECTIONS_VARIABLE = 'APP_LIFE_SECTIONS'
 
 
 class AppLife(Scene):
+    profiler = PROFILER
+    # the generation and population counter shown by put_counter()
+    counter = None
 
     def construct(self) -> None:
 
@@ -24,14 +55,28 @@ class AppLife(Scene):
         num_cols = 72
 
         # create an empty life board
-        life = Life(num_rows, num_cols)
+        life = create_life(num_rows, num_cols, engine=ENGINE, rule=RULE, boundary=BOUNDARY)
 
         # this grid will be our playground to display life animation
         grid = AppLife.create_grid(num_rows, num_cols, cell_height=14)
         self.add(grid)
 
         # ANIMATIONS:
+        sections = os.environ.get(SECTIONS_VARIABLE)
+        sections = sections.split(',') if sections else SECTIONS
+        for name in sections:
+            if name not in SECTIONS:
+                raise ValueError(f"unknown section '{name}', use some of: {', '.join(SECTIONS)}")
+            getattr(self, f'section_{name}')(grid, life)
 
+        if self.profiler is not None:
+            self.profiler.report()
+
+        # self.embed()
+
+    # the sections of the video, every one but the first starts from a cleared screen
+
+    def section_opening(self, grid, life):
         # 1. display moving glider
         self.glider(grid, life, num_generations=30, wait_time=0.1)
 
@@ -46,11 +91,13 @@ class AppLife(Scene):
         # self.clear_screen(grid, life)
         self.show_rules(grid, life)
 
+    def section_complexity(self, grid, life):
         # 4. show post rules message
         self.clear_screen(grid, life)
         self.show_text("These rules turn simple starting patterns into complex ones.\n"
                        "Some completely vanish and some keep progressing forever", font_size=BODY_FONT_SIZE, wait_time=2.5)
 
+    def section_r_pentomino(self, grid, life):
         # 5. R. Pentomino
         self.clear_screen(grid, life)
         self.show_text("R Pentomino", font_size=TITLE_FONT_SIZE, wait_time=1)
@@ -64,17 +111,20 @@ class AppLife(Scene):
         # self.clear_screen(grid, life)
         # self.show_text("Some interesting patterns:", font_size=BODY_FONT_SIZE)
 
+    def section_still_life(self, grid, life):
         # 7. Still Life
         self.clear_screen(grid, life)
         self.show_title_n_body("Still Life",
                                "Patterns that do not change in subsequent generations")
         self.still_life(grid, life, num_generations=15)
 
+    def section_oscillators(self, grid, life):
         # 8. Oscillators
         self.clear_screen(grid, life)
         self.show_title_n_body("Oscillators", "Come back to initial state after a few generations")
         self.oscillators(grid, life, num_generations=25, wait_time=0.3)
 
+    def section_glider_gun(self, grid, life):
         # 9. Glider
         self.clear_screen(grid, life)
         self.show_title_n_body("Gosper Glider Gun", "Emits a Glider at every 30th generation (discovered in 1970)")
@@ -82,6 +132,7 @@ class AppLife(Scene):
         self.wait(0.5)
         self.glider_gun(grid, life, num_generations=90, wait_time=0.05)
 
+    def section_copperhead(self, grid, life):
         # 10. Copperhead
         self.clear_screen(grid, life)
         self.show_title_n_body("Copperhead", "Spaceship (discovered in 2016)")
@@ -94,11 +145,18 @@ class AppLife(Scene):
         # self.show_text("If you Google 'Game of Life', it is a nice easter egg",
         #                font_size=TITLE_FONT_SIZE)
 
+    def section_question(self, grid, life):
         # 11. Predictability
         self.clear_screen(grid, life)
         self.show_question()
 
-        # self.embed()
+    def play(self, *args, **kwargs):
+        with phase(self.profiler, 'play'):
+            return super().play(*args, **kwargs)
+
+    def wait(self, *args, **kwargs):
+        with phase(self.profiler, 'wait'):
+            return super().wait(*args, **kwargs)
 
     @staticmethod
     def create_grid(num_rows, num_cols, cell_height=6):
@@ -115,63 +173,162 @@ class AppLife(Scene):
             v_buff=0
         )
 
+        # (i, j) of the squares currently displayed as live cells
+        grid.live_cells = set()
+
         return grid
 
-    def animate_grid(self, grid, life, num_generations, wait_time=0.1):
+    @staticmethod
+    def create_raster_grid(num_rows, num_cols, height=6, camera=None):
+        # the same grid drawn as one image, for boards too big for a Square per cell.
+        # pass the camera of the scene when it renders, see raster_grid.py
+        return RasterGrid(num_rows, num_cols, height=height,
+                          live_color=CUSTOM_WHITE, dead_color=RASTER_DEAD_COLOR, camera=camera)
+
+    @profiled
+    def animate_grid(self, grid, life, num_generations, wait_time=0.1, stop_when_stable=False):
         # the first iteration of loop plots the initial state of board
-        # second iteration displays the one next generation
-
-        # self.put_counter(wait_time)
+        # second iteration displays the one next generation.
+        # with stop_when_stable the animation ends once the board dies out or repeats itself,
+        # and returns what happened (see cycle_detection.Stabilization), otherwise None
+
+        # if these generations were simulated in an earlier render, replay them from the cache
+        key = timeline = None
+        if TIMELINE_CACHE is not None and TIMELINE_CACHE.can_cache(life):
+            key = TIMELINE_CACHE.key(life, num_generations, stop_when_stable)
+            timeline = TIMELINE_CACHE.load(key)
+        recorded_changes = []
+        detector = CycleDetector(life) if stop_when_stable and timeline is None else None
+        stabilization = timeline.stabilization if timeline is not None else None
+
+        first_generation = life.generation
+        board = None
+        changed_cells = []
+        if isinstance(grid, RasterGrid):
+            # the whole board is drawn every frame, kept up to date with the changed cells
+            # dying cells of Generations rules are shown as dead
+            board = (np.asarray(life.board) == 1).astype(np.uint8)
+        else:
+            # the board may have been changed since it was last displayed (cleared, new pattern),
+            # so the first frame compares all the live cells with the displayed ones
+            live_cells = {
+                (i, j) for i, j in life.live_cells()
+                if 0 <= i < life.num_rows and 0 <= j < life.num_cols
+            }
+            changed_cells = live_cells.symmetric_difference(grid.live_cells)
 
         generation = 1
         while generation <= num_generations:
-            self.wait(wait_time)
+            if timeline is not None and generation > len(timeline.changes):
+                # the recorded run stopped early
+                break
 
-            # put current state on display
-            # for i in range(life.num_rows):
-            for i in range(len(life.board)):
-                # for j in range(life.num_cols):
-                for j in range(len(life.board[0])):
-
-                    # grid is a one dimensional (400,) list
-                    grid_idx = life.num_cols * i + j
+            self.wait(wait_time)
 
-                    # this cell is alive
-                    if life.board[i][j] == 1:
-                        grid[grid_idx].set_fill(CUSTOM_WHITE)
-                        grid[grid_idx].set_stroke(BLACK, width=.3)
+            with phase(self.profiler, 'draw', len(changed_cells)):
+                if board is not None:
+                    grid.show_board(board)
+                else:
+                    # put current state on display, only the squares whose cell was born or died
+                    self.update_squares(grid, life, changed_cells)
+
+                if self.counter is not None:
+                    if timeline is None:
+                        # the engine counts its population while computing a generation
+                        population = life.stats.population
                     else:
-                        grid[grid_idx].set_fill(BLACK, opacity=_BLACK_OPACITY)
+                        # replayed generations aren't computed, count the cells on display
+                        population = len(grid.live_cells) if board is None else int(board.sum())
+                    self.update_counter(first_generation + generation - 1, population)
+
+            # the next frame differs from this one only by the cells changed in this generation
+            if timeline is None:
+                with phase(self.profiler, 'generation'):
+                    life.compute_next_state()
+                changed_cells = life.changed_cells()
+                recorded_changes.append(changed_cells)
+                if detector is not None:
+                    stabilization = detector.update(life)
+            else:
+                changed_cells = timeline.changes[generation - 1]
+
+            if board is not None:
+                AppLife.toggle_cells(board, changed_cells)
 
-            life.compute_next_state()
             generation += 1
+            if detector is not None and stabilization is not None:
+                break
 
+        if timeline is not None:
+            # leave the board where the simulation would have left it
+            timeline.restore(life)
+        elif key is not None:
+            TIMELINE_CACHE.save(key, Timeline(recorded_changes, life.live_cells(), stabilization))
+
+        return stabilization
+
+    @staticmethod
+    def toggle_cells(board, cells):
+        cells = np.array(cells, dtype=np.int64).reshape(-1, 2)
+        # unbounded engines have cells outside of the grid
+        inside = (
+            (cells[:, 0] >= 0) & (cells[:, 0] < board.shape[0]) &
+            (cells[:, 1] >= 0) & (cells[:, 1] < board.shape[1])
+        )
+        cells = cells[inside]
+        board[cells[:, 0], cells[:, 1]] ^= 1
+
+    @staticmethod
+    def update_squares(grid, life, changed_cells):
+        for i, j in changed_cells:
+            if not (0 <= i < life.num_rows and 0 <= j < life.num_cols):
+                # unbounded engines have cells outside of the grid
+                continue
+
+            # grid is a one dimensional (400,) list
+            grid_idx = life.num_cols * i + j
+
+            if (i, j) not in grid.live_cells:
+                # this cell is alive
+                grid[grid_idx].set_fill(CUSTOM_WHITE)
+                grid[grid_idx].set_stroke(BLACK, width=.3)
+                grid.live_cells.add((i, j))
+            else:
+                grid[grid_idx].set_fill(BLACK, opacity=_BLACK_OPACITY)
+                grid.live_cells.remove((i, j))
+
+    @profiled
     def show_title_n_body(self, title, body, wait_time=2.5):
-        title = Text(title, font_size=TITLE_FONT_SIZE, font=FONT_FAMILY)
-        body = Text(body, font_size=BODY_FONT_SIZE, font=FONT_FAMILY)
+        with phase(self.profiler, 'text'):
+            title = Text(title, font_size=TITLE_FONT_SIZE, font=FONT_FAMILY)
+            body = Text(body, font_size=BODY_FONT_SIZE, font=FONT_FAMILY)
         vgroup = VGroup(title, body).arrange(DOWN, buff=TITLE_BODY_BUFFER, center=False, aligned_edge=LEFT) #.set_y(0)
         vgroup.to_edge(UP)
         vgroup.to_edge(LEFT)
         self.play(FadeIn(vgroup))
         self.wait(wait_time)
 
+    @profiled
     def show_text(self, text_str, font_size, wait_time=2.5):
-        text = Text(text_str, font_size=font_size, font=FONT_FAMILY)
+        with phase(self.profiler, 'text'):
+            text = Text(text_str, font_size=font_size, font=FONT_FAMILY)
         text.to_edge(UP)
         text.to_edge(LEFT)
         self.play(FadeIn(text))
         self.wait(wait_time)
 
+    @profiled
     def show_question(self, wait_time=3):
-        text = Text(
-            "Q: Given a state of the board, is it possible to tell whether\n"
-            "a certain pattern will vanish or live forever?",
-                    font_size=BODY_FONT_SIZE, font=FONT_FAMILY)
+        with phase(self.profiler, 'text'):
+            text = Text(
+                "Q: Given a state of the board, is it possible to tell whether\n"
+                "a certain pattern will vanish or live forever?",
+                        font_size=BODY_FONT_SIZE, font=FONT_FAMILY)
+            credits_text = Text("code: github.com/emadehsan/life",
+                                font_size=BODY_FONT_SIZE, font=FONT_FAMILY)
         text.to_edge(UP)
         text.to_edge(LEFT)
 
-        credits_text = Text("code: github.com/emadehsan/life",
-                            font_size=BODY_FONT_SIZE, font=FONT_FAMILY)
         credits_text.to_edge(BOTTOM)
         text.to_edge(LEFT)
 
@@ -180,6 +337,7 @@ class AppLife(Scene):
         self.play(FadeIn(credits_text))
         self.wait(wait_time)
 
+    @profiled
     def show_rules(self, grid, life, wait_time=1.5):
         rules = [
             {
@@ -224,8 +382,9 @@ class AppLife(Scene):
             self.clear_screen(grid, life)
 
             # display this rule's text
-            title = Text(rule['title'], font_size=TITLE_FONT_SIZE, font=FONT_FAMILY)
-            body = Text(rule['body'], font_size=BODY_FONT_SIZE, font=FONT_FAMILY)
+            with phase(self.profiler, 'text'):
+                title = Text(rule['title'], font_size=TITLE_FONT_SIZE, font=FONT_FAMILY)
+                body = Text(rule['body'], font_size=BODY_FONT_SIZE, font=FONT_FAMILY)
             # body2 = Text(rule['body2'], font_size=BODY_FONT_SIZE, font=FONT_FAMILY)
 
             vgroup = VGroup(title, body).arrange(DOWN, buff=TITLE_BODY_BUFFER, center=False, aligned_edge=LEFT)
@@ -238,25 +397,34 @@ class AppLife(Scene):
 
             self.wait(wait_time)
 
+    @profiled
     def clear_screen(self, grid, life):
         life.clear_board()  # this will clear the live cells
 
-        # now animate the grid for one generation,
-        # this will make all the squares of the gird displayed to be gray(i.e. empty)
-        self.animate_grid(grid, life, num_generations=1)
+        # now make all the squares of the grid displayed to be gray(i.e. empty). only the squares of
+        # the cells that were live before the clear change, the rest of the grid isn't looked at
+        self.wait(0.1)
+        with phase(self.profiler, 'draw', len(getattr(grid, 'live_cells', ()))):
+            if isinstance(grid, RasterGrid):
+                grid.show_board(np.zeros((life.num_rows, life.num_cols), dtype=np.uint8))
+            else:
+                self.update_squares(grid, life, list(grid.live_cells))
 
         # clear text & animation
         self.clear()
+        self.counter = None
 
         # adds the background grid again (which is all gray cells, now)
         self.add(grid)
 
+    @profiled
     def glider(self, grid, life, num_generations, wait_time=0.1):
         life.clear_board()
         life.put_glider_at(life.num_rows//3, life.num_cols//3)
 
         self.animate_grid(grid, life, num_generations, wait_time)
 
+    @profiled
     def glider_gun(self, grid, life, num_generations, wait_time=0.1):
         life.clear_board()
         life.put_glider_gun(life.num_rows//2 - 5, life.num_cols//5)
@@ -290,44 +458,78 @@ class AppLife(Scene):
 
         self.wait(wait_time)
 
+    @profiled
     def r_pentomino(self, grid, life, num_generations, wait_time=0.1):
         # put R-pentomino and animate it
         life.clear_board()
         life.put_r_pentomino(life.num_rows//2, life.num_cols//2)
+        self.put_counter(life)
 
         self.animate_grid(grid, life, num_generations, wait_time)
 
-    def put_counter(self, wait_time):
-        # CountInFrom()
-
-        # counts the generation
-        counter = DecimalNumber(1)#, text_config={"font": "monospace"})  #.scale(2)
-        # ChangingDecimal()
-
-        def update_func(t):
-            return t *10
-
+    def put_counter(self, life):
+        # counts the generations from now on and the population, in the top right corner.
+        # animate_grid updates it every frame from life.stats, which costs no extra pass over the board
+        if self.counter is not None:
+            self.remove(self.counter[0])
+
+        with phase(self.profiler, 'text'):
+            labels = [Text(label, font_size=BODY_FONT_SIZE, font=FONT_FAMILY) for label in ('generation', 'population')]
+        generation = Integer(0, font_size=BODY_FONT_SIZE)
+        population = Integer(life.stats.population, font_size=BODY_FONT_SIZE)
+
+        counter = VGroup(
+            VGroup(labels[0], generation).arrange(RIGHT),
+            VGroup(labels[1], population).arrange(RIGHT),
+        ).arrange(DOWN, aligned_edge=RIGHT)
         counter.to_edge(UP)
         counter.to_edge(RIGHT)
-        # counter.
-        # ChangingDecimal()
-        # self.add(counter)
-        self.play(ChangingDecimal(counter, update_func), run_time=wait_time)
+        self.add(counter)
+        self.counter = (counter, generation, population, life.generation)
+
+    def update_counter(self, generation, population):
+        _, generation_number, population_number, first_generation = self.counter
+        generation_number.set_value(generation - first_generation)
+        population_number.set_value(population)
 
+    @profiled
     def still_life(self, grid, life, num_generations, wait_time=0.2):
         life.clear_board()
         life.put_still_life()
 
         self.animate_grid(grid, life, num_generations, wait_time)
 
+    @profiled
     def oscillators(self, grid, life, num_generations, wait_time=0.2):
         life.clear_board()
         life.put_oscillators()
 
         self.animate_grid(grid, life, num_generations, wait_time)
 
+    @profiled
     def copperhead(self, grid, life, num_generations, wait_time=0.2):
         life.clear_board()
         life.put_copperhead(life.num_rows//2 - 4, life.num_cols//2 - 6)
 
         self.animate_grid(grid, life, num_generations, wait_time)
+
+
+class LargeLife(AppLife):
+    # a random soup on a board far too large for a Square per cell
+
+    def construct(self) -> None:
+        num_rows = 450
+        num_cols = 800
+
+        life = create_life(num_rows, num_cols, engine='numpy', rule=RULE, boundary=BOUNDARY)
+        life.set_board_state(
+            (np.random.default_rng(0).random((num_rows, num_cols)) < 0.3).astype(np.uint8)
+        )
+
+        grid = AppLife.create_raster_grid(num_rows, num_cols, height=8, camera=self.camera)
+        self.add(grid)
+
+        self.animate_grid(grid, life, num_generations=300, wait_time=1 / 30)
+
+        if self.profiler is not None:
+            self.profiler.report()
@@ -1,4 +1,3 @@
-
 '''
 this script converts the head represented as ascii art in head.ascii.txt
 to a board configuration in Game of Life.
@@ -6,41 +5,30 @@ to a board configuration in Game of Life.
 Every ' ' (space) character is considered live.
 Dead otherwise
 '''
+import os
 import pprint
+import sys
 from typing import List
 
+# pattern_io is at the root of the repository, which isn't on the path when this script runs on its own
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from pattern_io import read_board
+
+HEAD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'head.ascii.txt')
+
+
 class AsciiToBoard:
 
     @staticmethod
     def read_board_state() -> List[List[int]]:
-
-        '''
-        either ignore the '\n' new line character at the end of each line.
-        or add a new line in the end of the of head.ascii.txt
-        to equalize the number of chars in each line. because each other line has a \n
-        at the end
-        '''
-        filepath = './assets/head.ascii.txt'
-        # filepath = './head.ascii.txt'
-
-        board = []
-        with open(filepath, 'r') as f:
-            line = f.readline()
-            while len(line) > 0:
-                row = []
-                for c in line:
-                    if c != '\n':
-                        # insert a 1 for every space. 0 otherwise
-                        row.append(
-                            1 if c == ' ' else 0
-                        )
-                board.append(row)
-                line = f.readline()
-
-        print(len(board), ' x ', len(board[0]))
-        return board
+        # the ascii art is read by pattern_io, the same as any other pattern file
+        return read_board(HEAD_PATH)
 
 
 
 if __name__ == '__main__':
-    AsciiToBoard.read_board_state()
\ No newline at end of file
+    board = AsciiToBoard.read_board_state()
+    print(len(board), ' x ', len(board[0]))
@@ -0,0 +1,396 @@
+'''
+benchmarks for the engines and the renderers
+
+    python bench.py scaling --sizes 4096 16384 --workers 1 2 4 8 16 32
+    python bench.py renderers --sizes 40 100 200 500
+    python bench.py suite --output after.json --baseline before.json
+    python bench.py memory --engine list --generations 1000000
+
+suite times every engine stepping random boards, placing patterns and updating the frames of
+AppLife, each case in a new process so its peak RSS is its own. the results are written as JSON,
+and compared against the results of an earlier run: slowdowns and memory growth over --threshold
+are printed and make the exit status 1.
+
+memory steps the glider gun of AppLife for a long run under tracemalloc and checks that the memory in use
+stays flat and that a generation allocates little: the exit status is 1 if it grew by more than --max-growth-kb.
+'''
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from bit_life import BitLife
+from engines import ENGINES, create_life
+from life_game import Life
+from numpy_life import NumpyLife
+from parallel_life import ParallelLife
+
+# the largest board, in cells, each slow engine or renderer is run on. the list engine takes
+# minutes for a generation of 8192 x 8192
+MAX_CELLS = {
+    'list': 512 * 512,
+    'hash': 512 * 512,
+    'sparse': 2048 * 2048,
+    'squares': 200 * 200,
+    'raster': 2048 * 2048,
+}
+PATTERN_METHODS = ('put_glider_gun', 'put_copperhead', 'meme_head')
+# the rate that says how fast each kind of case is, higher is better
+RATES = {'step': 'gen_per_s', 'place': 'calls_per_s', 'frames': 'frames_per_s'}
+
+
+def random_board(rows: int, cols: int, density: float, seed: int=0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.random((rows, cols), dtype=np.float32) < density).astype(np.uint8)
+
+
+def scaling(sizes: List[int], workers: List[int], generations: int, density: float) -> None:
+    # throughput of ParallelLife against the number of worker processes
+    print(f"{'size':>7} {'workers':>7} {'gen/s':>9} {'Mcells/s':>10} {'speedup':>8}")
+
+    for size in sizes:
+        board = random_board(size, size, density)
+        base_rate = None
+
+        for num_workers in workers:
+            with ParallelLife(workers=num_workers) as life:
+                life.set_board_state(board)
+                # the first generation also starts the workers
+                life.compute_next_state()
+
+                start = time.perf_counter()
+                for _ in range(generations):
+                    life.compute_next_state()
+                elapsed = time.perf_counter() - start
+
+            rate = generations / elapsed
+            base_rate = base_rate or rate
+            print(f"{size:>7} {num_workers:>7} {rate:>9.2f} {rate * size * size / 1e6:>10.1f} {rate / base_rate:>8.2f}")
+
+
+def renderers(sizes: List[int], frames: int, density: float) -> None:
+    # build time, time per frame and memory of the Square grid against the RasterGrid.
+    # needs manim, the frames are updated but not rendered
+    from app import AppLife
+
+    print(f"{'size':>5} {'renderer':>8} {'build s':>9} {'frame ms':>9} {'peak MB':>8}")
+
+    for size in sizes:
+        life = NumpyLife()
+        life.set_board_state(random_board(size, size, density))
+
+        for name in ('squares', 'raster'):
+            tracemalloc.start()
+
+            start = time.perf_counter()
+            if name == 'squares':
+                grid = AppLife.create_grid(size, size)
+            else:
+                grid = AppLife.create_raster_grid(size, size)
+            build_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            changed_cells = life.live_cells()
+            for _ in range(frames):
+                if name == 'squares':
+                    # a soup changes a large part of the board every generation
+                    AppLife.update_squares(grid, life, changed_cells)
+                else:
+                    grid.show_board(life.board)
+                life.compute_next_state()
+                changed_cells = life.changed_cells()
+            frame_time = (time.perf_counter() - start) / frames
+
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{size:>5} {name:>8} {build_time:>9.2f} {frame_time * 1000:>9.1f} {peak / 2**20:>8.1f}")
+
+
+def suite(sizes: List[Tuple[int, int]], densities: List[float], engines: List[str], generations: int,
+          max_seconds: float) -> List[dict]:
+    # runs every case in a new process and returns the results
+    cases = []
+    for rows, cols in sizes:
+        for engine in engines:
+            if rows * cols > MAX_CELLS.get(engine, rows * cols):
+                continue
+            for density in densities:
+                cases.append({'kind': 'step', 'name': engine, 'rows': rows, 'cols': cols, 'density': density})
+            for method in PATTERN_METHODS:
+                cases.append({'kind': 'place', 'name': method, 'engine': engine, 'rows': rows, 'cols': cols})
+
+        for renderer in ('squares', 'raster'):
+            if rows * cols <= MAX_CELLS[renderer]:
+                cases.append({'kind': 'frames', 'name': renderer, 'rows': rows, 'cols': cols, 'density': densities[-1]})
+
+    print(f"{'case':<44} {'rate':>12} {'Mcells/s':>10} {'peak MB':>8}")
+    results = []
+    for case in cases:
+        case.update(repetitions=generations, max_seconds=max_seconds)
+        # spawned, so the peak RSS isn't the one of an earlier case
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            result = executor.submit(run_case, case).result()
+        if result is None:
+            print(f"{case_key(case):<44} {'skipped, needs manim':>12}")
+            continue
+
+        results.append(result)
+        rate = result[RATES[result['kind']]]
+        cells_rate = f"{result['cells_per_s'] / 1e6:>10.1f}" if 'cells_per_s' in result else f"{'':>10}"
+        print(f"{case_key(result):<44} {rate:>12.2f} {cells_rate} {result['peak_rss_mb']:>8.1f}")
+    return results
+
+
+def run_case(case: dict) -> Optional[dict]:
+    # times one case, repeated until case['repetitions'] or case['max_seconds'] is reached.
+    # returns the case with its timings, or None if it can't run here
+    rows, cols = case['rows'], case['cols']
+    kind = case['kind']
+
+    if kind == 'step':
+        life = create_life(rows, cols, engine=case['name'])
+        _set_board(life, random_board(rows, cols, case['density']))
+        # the first generation also allocates buffers and starts workers
+        life.compute_next_state()
+        repetitions, seconds = _repeat(life.compute_next_state, case)
+        rate = repetitions / seconds
+        result = {'gen_per_s': rate, 'cells_per_s': rate * rows * cols}
+        _close(life)
+
+    elif kind == 'place':
+        life = create_life(rows, cols, engine=case['engine'])
+        method = getattr(life, case['name'])
+        if case['name'] == 'meme_head':
+            call = method
+        else:
+            # at the center, so the pattern fits on every board but the smallest
+            call = lambda: method(max(rows // 2 - 6, 0), max(cols // 2 - 18, 0))
+        repetitions, seconds = _repeat(call, case)
+        result = {'calls_per_s': repetitions / seconds}
+        _close(life)
+
+    else:
+        try:
+            from app import AppLife
+        except ImportError:
+            return None
+
+        life = NumpyLife()
+        life.set_board_state(random_board(rows, cols, case['density']))
+        if case['name'] == 'squares':
+            grid = AppLife.create_grid(rows, cols)
+            update = lambda: AppLife.update_squares(grid, life, life.changed_cells())
+        else:
+            grid = AppLife.create_raster_grid(rows, cols)
+            update = lambda: grid.show_board(life.board)
+
+        # only the frame updates are timed, not the generations between them
+        seconds = 0.0
+        repetitions = 0
+        while repetitions < case['repetitions'] and seconds < case['max_seconds']:
+            life.compute_next_state()
+            start = time.perf_counter()
+            update()
+            seconds += time.perf_counter() - start
+            repetitions += 1
+        result = {'frames_per_s': repetitions / seconds}
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss /= 2**20 if sys.platform == 'darwin' else 2**10
+    return {**case, **result, 'repetitions': repetitions, 'seconds': seconds, 'peak_rss_mb': peak_rss}
+
+
+def memory(engine: str, rows: int, cols: int, boundary: str, generations: int, samples: int,
+           max_growth_kb: float, max_peak_kb: float) -> bool:
+    # steps a glider gun for generations under tracemalloc. with a dead boundary its gliders die at the edges
+    # and the board repeats every 60 generations from about generation 50, so what a generation keeps allocated
+    # should not change. returns whether the memory in use stayed within max_growth_kb, and what the generations
+    # allocated on top of it within max_peak_kb
+    life = create_life(rows, cols, engine=engine, boundary=boundary)
+    life.put_glider_gun(rows // 2 - 5, cols // 5)
+    # past the start of the cycle, and the buffers of the engine are allocated
+    life.advance(1000)
+
+    tracemalloc.start()
+    print(f"{'generation':>10} {'in use KB':>10} {'peak KB':>8} {'gc runs':>8}")
+
+    first = None
+    max_peak = 0
+    sample_generations = max(generations // samples, 1)
+    for generation in range(0, generations, sample_generations):
+        collections = gc.get_stats()[0]['collections']
+        start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        life.advance(min(sample_generations, generations - generation))
+
+        # the peak is what a generation allocates on top of what stays allocated.
+        # the memory in use is compared with the end of the first samples, when what a cycle keeps is allocated
+        current, peak = tracemalloc.get_traced_memory()
+        first = current if first is None else first
+        max_peak = max(max_peak, peak - start)
+        print(f"{generation + sample_generations:>10} {current / 1024:>10.1f} {(peak - start) / 1024:>8.1f} "
+              f"{gc.get_stats()[0]['collections'] - collections:>8}")
+
+    tracemalloc.stop()
+    growth = (current - first) / 1024
+    print(f'memory in use grew by {growth:.1f} KB in {generations} generations, the peak was {max_peak / 1024:.1f} KB')
+    _close(life)
+
+    within_bounds = True
+    if growth > max_growth_kb:
+        print(f'FAILED: the memory in use grew by more than {max_growth_kb} KB')
+        within_bounds = False
+    if max_peak / 1024 > max_peak_kb:
+        print(f'FAILED: the peak was over {max_peak_kb} KB')
+        within_bounds = False
+    return within_bounds
+
+
+def case_key(case: dict) -> str:
+    # the same case in different runs has the same key
+    where = f"{case['rows']}x{case['cols']}"
+    if case['kind'] == 'place':
+        return f"place/{case['engine']}/{case['name']}/{where}"
+    return f"{case['kind']}/{case['name']}/{where}/{case['density']}"
+
+
+def compare(results: List[dict], baseline: List[dict], threshold: float) -> List[str]:
+    # the cases that got slower, or took more memory, than in the baseline by more than threshold
+    previous = {case_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(case_key(result))
+        if before is None:
+            continue
+
+        rate = RATES[result['kind']]
+        if result[rate] < before[rate] * (1 - threshold):
+            regressions.append(
+                f"{case_key(result)}: {rate} {before[rate]:.2f} -> {result[rate]:.2f} "
+                f"({result[rate] / before[rate] - 1:+.0%})"
+            )
+        if result['peak_rss_mb'] > before['peak_rss_mb'] * (1 + threshold):
+            regressions.append(
+                f"{case_key(result)}: peak RSS {before['peak_rss_mb']:.1f} MB -> {result['peak_rss_mb']:.1f} MB"
+            )
+    return regressions
+
+
+def parse_size(size: str) -> Tuple[int, int]:
+    # '40x72' or '2048' for 2048 x 2048
+    rows, _, cols = size.partition('x')
+    return int(rows), int(cols or rows)
+
+
+def _repeat(call, case: dict) -> Tuple[int, float]:
+    repetitions = 0
+    start = time.perf_counter()
+    while True:
+        call()
+        repetitions += 1
+        elapsed = time.perf_counter() - start
+        if repetitions >= case['repetitions'] or elapsed >= case['max_seconds']:
+            return repetitions, elapsed
+
+
+def _set_board(life: Life, board: np.ndarray) -> None:
+    if isinstance(life, (NumpyLife, BitLife)):
+        life.set_board_state(board)
+    else:
+        life.set_board_state(board.tolist())
+
+
+def _close(life: Life) -> None:
+    # parallel and memmap engines hold workers and files
+    if hasattr(life, 'close'):
+        life.close()
+
+
+def _environment() -> Dict[str, object]:
+    # what the numbers depend on, to tell whether two runs can be compared
+    return {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='benchmarks for the Game of Life engines')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    scaling_parser = commands.add_parser('scaling', help='ParallelLife throughput against worker count')
+    scaling_parser.add_argument('--sizes', type=int, nargs='+', default=[4096, 16384])
+    scaling_parser.add_argument('--workers', type=int, nargs='+',
+                                default=[n for n in (1, 2, 4, 8, 16, 32) if n <= (os.cpu_count() or 1)])
+    scaling_parser.add_argument('--generations', type=int, default=10)
+    scaling_parser.add_argument('--density', type=float, default=0.3)
+
+    renderers_parser = commands.add_parser('renderers', help='Square grid against RasterGrid (needs manim)')
+    renderers_parser.add_argument('--sizes', type=int, nargs='+', default=[40, 100, 200, 500])
+    renderers_parser.add_argument('--frames', type=int, default=10)
+    renderers_parser.add_argument('--density', type=float, default=0.3)
+
+    suite_parser = commands.add_parser('suite', help='engines, pattern placement and frame updates, written as JSON')
+    suite_parser.add_argument('--sizes', nargs='+', default=['40x72', '512', '2048', '8192'],
+                              help="board sizes like 40x72, or 2048 for 2048x2048")
+    suite_parser.add_argument('--densities', type=float, nargs='+', default=[0.05, 0.3])
+    suite_parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES), default=list(ENGINES))
+    suite_parser.add_argument('--generations', type=int, default=20, help='repetitions of each case at most')
+    suite_parser.add_argument('--max-seconds', type=float, default=2.0, help='time of each case at most')
+    suite_parser.add_argument('--output', default='bench.json', help='JSON file for the results')
+    suite_parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+    suite_parser.add_argument('--threshold', type=float, default=0.1,
+                              help='slowdown or memory growth, as a fraction, that counts as a regression')
+
+    memory_parser = commands.add_parser('memory', help='memory use of a long run under tracemalloc')
+    memory_parser.add_argument('--engine', choices=sorted(ENGINES), default='list')
+    memory_parser.add_argument('--size', default='40x72', help='board size like 40x72, or 2048 for 2048x2048')
+    memory_parser.add_argument('--boundary', default='dead')
+    memory_parser.add_argument('--generations', type=int, default=1000000)
+    memory_parser.add_argument('--samples', type=int, default=20, help='lines printed during the run')
+    memory_parser.add_argument('--max-growth-kb', type=float, default=64.0)
+    memory_parser.add_argument('--max-peak-kb', type=float, default=64.0,
+                               help='what the generations of a sample allocate on top of the memory in use, at most')
+
+    args = parser.parse_args()
+    if args.command == 'scaling':
+        scaling(args.sizes, args.workers, args.generations, args.density)
+    elif args.command == 'renderers':
+        renderers(args.sizes, args.frames, args.density)
+    elif args.command == 'suite':
+        results = suite([parse_size(size) for size in args.sizes], args.densities, args.engines,
+                        args.generations, args.max_seconds)
+        with open(args.output, 'w') as f:
+            json.dump({'environment': _environment(), 'results': results}, f, indent=1)
+
+        if args.baseline:
+            with open(args.baseline) as f:
+                regressions = compare(results, json.load(f)['results'], args.threshold)
+            for regression in regressions:
+                print('REGRESSION', regression)
+            if regressions:
+                sys.exit(1)
+    elif args.command == 'memory':
+        rows, cols = parse_size(args.size)
+        if not memory(args.engine, rows, cols, args.boundary, args.generations, args.samples, args.max_growth_kb,
+                      args.max_peak_kb):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,400 @@
+from functools import lru_cache
+from itertools import product
+from typing import FrozenSet, List, Optional, Tuple, Union
+
+import numpy as np
+
+from life_game import Life
+from life_stats import LifeStats, bounding_box
+from rules import CONWAY, Rule
+
+WORD_BITS = 64
+_ONE = np.uint64(1)
+_ALL_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+_LAST_BIT = np.uint64(WORD_BITS - 1)
+# number of (rows, words) buffers used by neighbour_count_planes
+SCRATCH_PLANES = 9
+# extra buffers to apply the rule to the count planes
+RULE_PLANES = 2
+# scratch planes that are free once neighbour_count_planes has returned, and the extra ones
+_FREE_PLANES = (0, 1, 4, 5, 8, 9, 10)
+# rows computed together in one generation step
+BAND_ROWS = 256
+
+
+def pack_rows(board: np.ndarray) -> np.ndarray:
+    # packs a (rows, cols) 0/1 array into (rows, ceil(cols/64)) uint64 words.
+    # column j is bit j % 64 of word j // 64
+    rows, cols = board.shape
+    num_words = (cols + WORD_BITS - 1) // WORD_BITS
+
+    packed = np.zeros((rows, num_words * 8), dtype=np.uint8)
+    packed[:, :(cols + 7) // 8] = np.packbits(board, axis=1, bitorder='little')
+    return packed.view('<u8').astype(np.uint64)
+
+
+def unpack_rows(words: np.ndarray, num_cols: int) -> np.ndarray:
+    as_bytes = words.astype('<u8').view(np.uint8)
+    return np.unpackbits(as_bytes, axis=1, count=num_cols, bitorder='little')
+
+
+def popcount(words: np.ndarray) -> int:
+    # number of set bits
+    if hasattr(np, 'bitwise_count'):
+        # NumPy 2.0 and later
+        return int(np.bitwise_count(words).sum())
+    return int(np.unpackbits(words.astype('<u8').view(np.uint8)).sum())
+
+
+def neighbour_count_planes(words: np.ndarray, scratch: np.ndarray, boundary: str='dead',
+                           num_cols: int=0) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # counts the neighbours of 64 cells at a time with bitwise adders.
+    # returns the 4 bits of the counts (0..8) as separate bit planes, least significant first.
+    # scratch is a (SCRATCH_PLANES, rows, words) buffer, the returned planes are views into it.
+    # the rows above the first and below the last are dead, the columns outside of the
+    # num_cols columns are what the boundary says (see boundary.py)
+    west, east, row_0, row_1, side_0, side_1, above_1, below_1, tmp = scratch
+
+    # neighbours to the left and right in the same row, carrying bits over word boundaries
+    np.left_shift(words, _ONE, out=west)
+    np.right_shift(words[:, :-1], _LAST_BIT, out=tmp[:, 1:])
+    west[:, 1:] |= tmp[:, 1:]
+    np.right_shift(words, _ONE, out=east)
+    np.left_shift(words[:, 1:], _LAST_BIT, out=tmp[:, :-1])
+    east[:, :-1] |= tmp[:, :-1]
+
+    if boundary != 'dead' and num_cols:
+        # the neighbours across the left and right edges, the bits shifted in above are dead
+        last = np.uint64((num_cols - 1) % WORD_BITS)
+        first_bits = words[:, 0] & _ONE
+        last_bits = (words[:, -1] >> last) & _ONE
+        if boundary == 'mirror':
+            west[:, 0] |= first_bits
+            east[:, -1] |= last_bits << last
+        else:
+            west[:, 0] |= last_bits
+            east[:, -1] |= first_bits << last
+
+    # sum of the 3 cells of every row as 2 bits
+    np.bitwise_xor(west, words, out=row_0)
+    np.bitwise_and(row_0, east, out=tmp)
+    row_0 ^= east
+    np.bitwise_and(west, words, out=row_1)
+    row_1 |= tmp
+
+    # sum of the left and right neighbours as 2 bits
+    np.bitwise_xor(west, east, out=side_0)
+    np.bitwise_and(west, east, out=side_1)
+
+    # sums of the rows above and below, dead outside of the board
+    above_0, below_0 = west, east
+    _shift_down(row_0, out=above_0)
+    _shift_up(row_0, out=below_0)
+    _shift_down(row_1, out=above_1)
+    _shift_up(row_1, out=below_1)
+
+    # add the three 2 bit numbers, first bit
+    count_0, carry = row_0, row_1
+    np.bitwise_xor(above_0, below_0, out=tmp)
+    np.bitwise_xor(tmp, side_0, out=count_0)
+    tmp &= side_0
+    np.bitwise_and(above_0, below_0, out=carry)
+    carry |= tmp
+
+    # the rest of the count is 2 * (above_1 + below_1 + side_1 + carry)
+    x1, y1, x2, y2, z = above_0, below_0, side_0, tmp, side_1
+    np.bitwise_xor(above_1, below_1, out=x1)
+    np.bitwise_and(above_1, below_1, out=y1)
+    np.bitwise_and(side_1, carry, out=y2)
+    np.bitwise_xor(side_1, carry, out=x2)
+    np.bitwise_and(x1, x2, out=z)
+
+    count_1, count_2, count_3 = above_1, below_1, carry
+    np.bitwise_xor(x1, x2, out=count_1)
+    np.bitwise_xor(y1, y2, out=count_2)
+    count_2 ^= z
+    np.bitwise_and(y1, y2, out=count_3)
+
+    return count_0, count_1, count_2, count_3
+
+
+# a set of counts as a boolean function of the count planes: a sum of products of the planes
+# count_0, count_1, count_2 (an implicant is a value for each, 0, 1 or None for either),
+# and what to do with count_3, the plane of 8 neighbours
+Implicant = Tuple[Optional[int], Optional[int], Optional[int]]
+
+
+@lru_cache(maxsize=None)
+def count_function(counts: FrozenSet[int]) -> Tuple[Tuple[Implicant, ...], Optional[str]]:
+    # with 8 neighbours the lower 3 planes are 0, like with 0 neighbours. so 0 and 8 share the
+    # implicants of 000, and count_3 tells them apart when only one of them is in counts
+    values = {count for count in counts if 1 <= count <= 7}
+    fix = None
+    if 0 in counts:
+        values.add(0)
+        if 8 not in counts:
+            fix = 'without_8'
+    elif 8 in counts:
+        fix = 'with_8'
+
+    # all the products that are true only for values, the largest first,
+    # then a greedy cover of the values
+    implicants = [
+        bits for bits in product((None, 0, 1), repeat=3)
+        if all(value in values for value in _values_of(bits))
+    ]
+    implicants.sort(key=lambda bits: -len(_values_of(bits)))
+    chosen = []
+    uncovered = set(values)
+    while uncovered:
+        best = max(implicants, key=lambda bits: len(uncovered & _values_of(bits)))
+        chosen.append(best)
+        uncovered -= _values_of(best)
+
+    return tuple(chosen), fix
+
+
+def _values_of(bits: Implicant) -> set:
+    return {
+        value for value in range(8)
+        if all(bit is None or (value >> k) & 1 == bit for k, bit in enumerate(bits))
+    }
+
+
+def apply_count_function(function: Tuple[Tuple[Implicant, ...], Optional[str]], planes: Tuple[np.ndarray, ...],
+                         inverted: List[Optional[np.ndarray]], out: np.ndarray, tmp: np.ndarray) -> np.ndarray:
+    # out = the bits whose count is in the set of function. inverted[k] is ~planes[k],
+    # for every plane an implicant needs as 0
+    implicants, fix = function
+    if not implicants:
+        out.fill(0)
+    for n, bits in enumerate(implicants):
+        literals = [planes[k] if bit else inverted[k] for k, bit in enumerate(bits) if bit is not None]
+        # the first product goes straight to out, the others are added to it
+        target = out if n == 0 else tmp
+        if not literals:
+            target.fill(_ALL_ONES)
+        elif len(literals) == 1:
+            np.copyto(target, literals[0])
+        else:
+            np.bitwise_and(literals[0], literals[1], out=target)
+            for literal in literals[2:]:
+                target &= literal
+        if n > 0:
+            out |= tmp
+
+    if fix == 'without_8':
+        np.bitwise_and(out, planes[3], out=tmp)
+        out ^= tmp
+    elif fix == 'with_8':
+        out |= planes[3]
+    return out
+
+
+def _shift_down(rows: np.ndarray, out: np.ndarray) -> None:
+    out[0] = 0
+    out[1:] = rows[:-1]
+
+
+def _shift_up(rows: np.ndarray, out: np.ndarray) -> None:
+    out[-1] = 0
+    out[:-1] = rows[1:]
+
+
+class BitLife(Life):
+    # each row of the board is packed into 64 bit words, one bit per cell,
+    # and a generation is computed 64 cells at a time with bitwise logic.
+    # the list of lists board is only built when it is asked for
+
+    # the stats of the current generation once counted, and the population while it is known.
+    # with track_stats() a generation counts its births and deaths on the changed words it found and
+    # adds them to the population, otherwise the stats are counted on the words when they are asked for
+    _stats: Optional[LifeStats] = None
+    _population: Optional[int] = None
+
+    def __init__(self, num_rows: int=0, num_cols: int=0, rule: Union[str, Rule]=CONWAY, boundary: str='dead'):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.generation = 0
+        self.rule = rule
+        self.boundary = boundary
+
+        self.words = np.zeros((num_rows, self._num_words(num_cols)), dtype=np.uint64)
+        self._tail_mask = self._make_tail_mask(num_cols)
+        self._board: Optional[np.ndarray] = None
+        self._allocate_buffers()
+
+    @property
+    def board(self) -> np.ndarray:
+        # unpacked (num_rows, num_cols) uint8 copy of the board, kept until the board changes
+        if self._board is None:
+            self._board = unpack_rows(self.words, self.num_cols)
+        return self._board
+
+    def clear_board(self) -> None:
+        self.words.fill(0)
+        self._changed_words.fill(0)
+        self._board = None
+        self._stats = None
+        self._population = 0
+
+    def set_board_state(self, board: Union[List[List[int]], np.ndarray]) -> None:
+        board = np.asarray(board, dtype=np.uint8)
+
+        self.num_rows, self.num_cols = board.shape
+        self.words = pack_rows(board)
+        self._tail_mask = self._make_tail_mask(self.num_cols)
+        self._board = None
+        self._allocate_buffers()
+        self._stats = self._population = None
+
+    def get_board(self) -> List[List[int]]:
+        return self.board.tolist()
+
+    def live_cells(self) -> List[Tuple[int, int]]:
+        rows, cols = np.nonzero(self.board)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    def changed_cells(self) -> List[Tuple[int, int]]:
+        rows, cols = np.nonzero(unpack_rows(self._changed_words, self.num_cols))
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    @property
+    def stats(self) -> LifeStats:
+        if self._stats is None:
+            # counted on the words of the board and of the cells changed in the last generation
+            self._population = None
+            self._stats = self._step_stats()
+        return self._stats
+
+    def compute_next_state(self) -> None:
+        # with the sets of counts of the rule as functions of the count planes:
+        # next = born ^ (alive & (born ^ survives))
+        born_function = count_function(self.rule.birth)
+        differ_function = count_function(self.rule.birth ^ self.rule.survival)
+        inverted_planes = {
+            k
+            for implicants, _ in (born_function, differ_function)
+            for bits in implicants
+            for k, bit in enumerate(bits) if bit == 0
+        }
+
+        # a band of rows at a time, so the scratch buffers stay small next to the board
+        for start in range(0, self.num_rows, BAND_ROWS):
+            end = min(start + BAND_ROWS, self.num_rows)
+            band, offset = self._band_with_halo(start, end)
+
+            scratch = self._scratch[:, :len(band)]
+            planes = neighbour_count_planes(band, scratch[:SCRATCH_PLANES], self.boundary, self.num_cols)
+
+            # the planes neighbour_count_planes doesn't return, and the extra ones
+            born, differ, tmp, *spare = (scratch[k] for k in _FREE_PLANES)
+            inverted: List[Optional[np.ndarray]] = [None, None, None]
+            for k in inverted_planes:
+                inverted[k] = np.invert(planes[k], out=spare[k])
+
+            apply_count_function(born_function, planes, inverted, born, tmp)
+            apply_count_function(differ_function, planes, inverted, differ, tmp)
+            differ &= band
+            np.bitwise_xor(
+                born[offset:offset + end - start],
+                differ[offset:offset + end - start],
+                out=self._next_words[start:end]
+            )
+
+        # the bits after the last column must stay dead
+        self._next_words[:, -1:] &= self._tail_mask
+
+        self.words, self._next_words = self._next_words, self.words
+        np.bitwise_xor(self.words, self._next_words, out=self._changed_words)
+        self._board = None
+        self.generation += 1
+        self._stats = None
+        if self._stats_history is not None:
+            self._stats = self._step_stats()
+        else:
+            # the population isn't followed through the generations that aren't counted
+            self._population = None
+        self._record_stats()
+
+    def _step_stats(self) -> LifeStats:
+        # from the changed words: the changed cells that are live were born, the others died.
+        # the columns with live cells are the bits of all the rows or-ed together
+        changed = popcount(self._changed_words)
+        births = popcount(self._changed_words & self.words)
+        if self._population is None:
+            self._population = popcount(self.words)
+        else:
+            self._population += births - (changed - births)
+        columns = unpack_rows(np.bitwise_or.reduce(self.words, axis=0)[np.newaxis], self.num_cols)[0]
+        return LifeStats(
+            self.generation, self._population, births, changed - births,
+            bounding_box(self.words.any(axis=1), columns),
+        )
+
+    def _make_live(self, cells: List[Tuple[int, int]], i: int, j: int) -> None:
+        cells = np.asarray(cells)
+        rows = cells[:, 0] + i
+        cols = cells[:, 1] + j
+
+        # negative indexes count from the end, like in the list board
+        rows = np.where(rows < 0, rows + self.num_rows, rows)
+        cols = np.where(cols < 0, cols + self.num_cols, cols)
+        if rows.min() < 0 or rows.max() >= self.num_rows or cols.min() < 0 or cols.max() >= self.num_cols:
+            raise IndexError('cells outside of the board')
+
+        bits = _ONE << (cols % WORD_BITS).astype(np.uint64)
+        np.bitwise_or.at(self.words, (rows, cols // WORD_BITS), bits)
+        self._board = None
+        self._stats = self._population = None
+
+    def _allocate_buffers(self) -> None:
+        # buffers reused by every generation, so stepping does not allocate.
+        # the board takes 1 bit per cell, 3 bits per cell with the next board and the changes
+        self._next_words = np.zeros_like(self.words)
+        # bits of the cells that changed in the last generation
+        self._changed_words = np.zeros_like(self.words)
+        band_rows = min(BAND_ROWS, self.num_rows) + 2
+        self._scratch = np.zeros((SCRATCH_PLANES + RULE_PLANES, band_rows, self.words.shape[1]), dtype=np.uint64)
+        # the first and last bands with the rows across the edges, for the boundaries other than dead
+        self._halo_band = np.zeros((band_rows, self.words.shape[1]), dtype=np.uint64)
+
+    def _band_with_halo(self, start: int, end: int) -> Tuple[np.ndarray, int]:
+        # the words of rows start:end with one extra row on each side, for the neighbours of the first
+        # and last rows, and the offset of row start in them
+        top = max(start - 1, 0)
+        bottom = min(end + 1, self.num_rows)
+        if self.boundary == 'dead' or (top < start and bottom > end):
+            return self.words[top:bottom], start - top
+
+        # the band reaches an edge of the board, the row across it is an image of a row of the board
+        band = self._halo_band[:end - start + 2]
+        band[1:-1] = self.words[start:end]
+        band[0] = self.words[top] if top < start else self._row_image(-1)
+        band[-1] = self.words[end] if bottom > end else self._row_image(self.num_rows)
+        return band, 1
+
+    def _row_image(self, i: int) -> np.ndarray:
+        # the words of the row of the board that row i, just above or below the board, stands for
+        if self.boundary == 'mirror':
+            return self.words[min(max(i, 0), self.num_rows - 1)]
+        row = self.words[i % self.num_rows]
+        if self.boundary == 'klein':
+            # mirrored left to right
+            return pack_rows(unpack_rows(row[np.newaxis], self.num_cols)[:, ::-1])[0]
+        return row
+
+    def _check_rule(self, rule: Rule) -> None:
+        if rule.states > 2:
+            raise ValueError(f'{rule}: BitLife only runs rules with 2 states')
+
+    @staticmethod
+    def _num_words(num_cols: int) -> int:
+        return (num_cols + WORD_BITS - 1) // WORD_BITS
+
+    @staticmethod
+    def _make_tail_mask(num_cols: int) -> np.uint64:
+        used_bits = num_cols % WORD_BITS
+        if used_bits == 0:
+            return np.uint64(0xFFFFFFFFFFFFFFFF)
+        return np.uint64((1 << used_bits) - 1)
@@ -0,0 +1,53 @@
+'''
+what is outside of the edges of a bounded board. every engine takes a boundary:
+
+    dead      cells outside of the board are dead, the default
+    torus     the left edge is glued to the right one and the top edge to the bottom one,
+              a glider that leaves the board on one side comes back on the other
+    klein     a Klein bottle: like torus, but what crosses the top or bottom edge comes back
+              mirrored left to right
+    mirror    the board is reflected at its edges, the cell just outside is a copy of the cell on the edge
+
+the engines don't test the bounds of each neighbour. they count neighbours on the board padded with
+a halo of one cell on each side, and the halo holds the images of the cells on the edges:
+the numpy engines fill it from the board before a generation, Life updates it when an edge cell changes.
+'''
+from typing import Dict, List, Optional, Tuple
+
+BOUNDARIES = ('dead', 'torus', 'klein', 'mirror')
+
+
+def cell_image(i: int, j: int, num_rows: int, num_cols: int, boundary: str) -> Optional[Tuple[int, int]]:
+    # the cell of the board that i, j stands for, when it is at most one cell outside of the board.
+    # None if it is dead
+    inside_rows = 0 <= i < num_rows
+    inside_cols = 0 <= j < num_cols
+    if inside_rows and inside_cols:
+        return i, j
+    if boundary == 'dead' or num_rows == 0 or num_cols == 0:
+        return None
+
+    # columns first, so the corners of a Klein bottle are mirrored after they wrapped
+    if not inside_cols:
+        j = (0 if j < 0 else num_cols - 1) if boundary == 'mirror' else j % num_cols
+    if not inside_rows:
+        if boundary == 'mirror':
+            i = 0 if i < 0 else num_rows - 1
+        else:
+            i %= num_rows
+            if boundary == 'klein':
+                j = num_cols - 1 - j
+    return i, j
+
+
+def halo_cells(num_rows: int, num_cols: int, boundary: str) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
+    # for every cell on the edges of the board, the cells of the halo around the board that are its images
+    halo = [(i, j) for i in (-1, num_rows) for j in range(-1, num_cols + 1)]
+    halo += [(i, j) for i in range(num_rows) for j in (-1, num_cols)]
+
+    images: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+    for i, j in halo:
+        cell = cell_image(i, j, num_rows, num_cols, boundary)
+        if cell is not None:
+            images.setdefault(cell, []).append((i, j))
+    return images
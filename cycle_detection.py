@@ -0,0 +1,133 @@
+'''
+tells when a run has stopped doing anything new: the board died out, became a still life or an oscillator.
+
+the board is hashed Zobrist style: every cell (i, j) has a random 64 bit key and the hash of a board
+is the XOR of the keys of its live cells. a cell that is born or dies flips its key in and out,
+so the hash of the next generation is the hash of this one XORed with the keys of changed_cells(),
+O(changed cells) per generation. the keys are computed from the coordinates (splitmix64),
+so unbounded boards need no table.
+
+with Generations rules the dying cells are part of the board too: a dying cell has a key of its position
+and its state. they change state every generation, so their part of the hash is computed again every
+generation from the dying cells.
+
+the hashes of the last history_size generations are kept. when a hash comes back the board repeats
+with period (generation - generation of the first time it was seen).
+'''
+from collections import OrderedDict
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+_GOLDEN = np.uint64(0x9e3779b97f4a7c15)
+_MIX_1 = np.uint64(0xbf58476d1ce4e5b9)
+_MIX_2 = np.uint64(0x94d049bb133111eb)
+_LOW_32 = np.uint64(0xffffffff)
+
+# the kinds of Stabilization
+STABILIZATION_KINDS = ('extinct', 'still life', 'oscillator')
+
+
+def cell_keys(cells: Iterable[Tuple[int, int]]) -> np.ndarray:
+    # the random key of every cell, the same for the same (i, j) in every run
+    cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+    x = (cells[:, 0].astype(np.uint64) << np.uint64(32)) ^ (cells[:, 1].astype(np.uint64) & _LOW_32)
+    return _mix(x)
+
+
+def dying_cell_keys(cells: Iterable[Tuple[int, int, int]]) -> np.ndarray:
+    # the random key of every (i, j, state) of a dying cell, different for every state of the same cell
+    cells = np.asarray(cells, dtype=np.int64).reshape(-1, 3)
+    return _mix(cell_keys(cells[:, :2]) ^ (cells[:, 2].astype(np.uint64) * _GOLDEN))
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer
+    x += _GOLDEN
+    x = (x ^ (x >> np.uint64(30))) * _MIX_1
+    x = (x ^ (x >> np.uint64(27))) * _MIX_2
+    return x ^ (x >> np.uint64(31))
+
+
+def zobrist_hash(cells: Iterable[Tuple[int, int]]) -> int:
+    # XOR of the keys of the cells, 0 for no cells
+    return int(np.bitwise_xor.reduce(cell_keys(cells), initial=np.uint64(0)))
+
+
+def dying_cells(life) -> List[Tuple[int, int, int]]:
+    # (i, j, state) of the dying cells of Generations rules, none with 2 states
+    if life.rule.states == 2:
+        return []
+    dying = getattr(life, '_dying', None)
+    if dying is not None:
+        # the sparse engine keeps them apart from the live cells, also outside of the board
+        return [(i, j, state) for (i, j), state in dying.items()]
+    board = np.asarray(life.board)
+    rows, cols = np.nonzero(board > 1)
+    return list(zip(rows.tolist(), cols.tolist(), board[rows, cols].tolist()))
+
+
+class Stabilization(NamedTuple):
+    # kind is one of STABILIZATION_KINDS. from the generation 'generation' on,
+    # the board repeats every 'period' generations (0 for an empty board)
+    kind: str
+    generation: int
+    period: int
+
+    def __str__(self) -> str:
+        if self.kind == 'extinct':
+            return f'extinct at gen {self.generation}'
+        if self.kind == 'still life':
+            return f'still life from gen {self.generation}'
+        return f'period-{self.period} oscillator from gen {self.generation}'
+
+
+class CycleDetector:
+    # create it on the board to watch, then call update() after every generation.
+    # if the board is changed in another way (a new pattern, set_board_state) call reset()
+
+    def __init__(self, life, history_size: int=4096):
+        self.history_size = history_size
+        self.reset(life)
+
+    def reset(self, life) -> None:
+        # the hash of the live cells, and of the board with its dying cells
+        self._live_hash = zobrist_hash(life.live_cells())
+        self.hash = self._live_hash ^ self._dying_hash(life)
+        self.generation = life.generation
+        # hash -> first generation it was seen at, oldest first
+        self._history: 'OrderedDict[int, int]' = OrderedDict()
+        self._remember()
+
+    def update(self, life) -> Optional[Stabilization]:
+        # the stabilization if the board is empty or repeats an earlier generation, otherwise None
+        changed_cells = life.changed_cells()
+        if changed_cells:
+            self._live_hash ^= zobrist_hash(changed_cells)
+        dying_hash = self._dying_hash(life)
+        self.hash = self._live_hash ^ dying_hash
+        self.generation = life.generation
+
+        if self._live_hash == 0 and dying_hash == 0:
+            return Stabilization('extinct', self.generation, 0)
+
+        first_seen = self._history.get(self.hash)
+        if first_seen is not None:
+            period = self.generation - first_seen
+            kind = 'still life' if period == 1 else 'oscillator'
+            return Stabilization(kind, first_seen, period)
+
+        self._remember()
+        return None
+
+    @staticmethod
+    def _dying_hash(life) -> int:
+        cells = dying_cells(life)
+        if not cells:
+            return 0
+        return int(np.bitwise_xor.reduce(dying_cell_keys(cells), initial=np.uint64(0)))
+
+    def _remember(self) -> None:
+        self._history[self.hash] = self.generation
+        if len(self._history) > self.history_size:
+            self._history.popitem(last=False)
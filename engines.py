@@ -0,0 +1,27 @@
+from typing import Dict, Type
+
+from bit_life import BitLife
+from hash_life import HashLife
+from life_game import Life
+from memmap_life import MemmapLife
+from numpy_life import NumpyLife
+from parallel_life import ParallelLife
+from sparse_life import SparseLife
+
+# engines that can be selected by name. all of them have the same interface as Life
+ENGINES: Dict[str, Type[Life]] = {
+    'list': Life,
+    'numpy': NumpyLife,
+    'sparse': SparseLife,
+    'hash': HashLife,
+    'bit': BitLife,
+    'parallel': ParallelLife,
+    'memmap': MemmapLife,
+}
+
+
+def create_life(num_rows: int=0, num_cols: int=0, engine: str='list', **kwargs) -> Life:
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine '{engine}', choose one of: {', '.join(ENGINES)}")
+
+    return ENGINES[engine](num_rows, num_cols, **kwargs)
@@ -0,0 +1,138 @@
+'''
+a simulation as a stream of frames, for code that wants the generations of a board without
+driving compute_next_state itself.
+
+run() (also life.run()) is a lazy generator of Frames, one every `every` generations, with the parts
+asked for in `content`:
+
+    board         the board of the engine
+    changes       the cells that were born or died since the previous frame (all the live cells in the first one)
+    population    the number of live cells
+
+    for frame in life.run(1000, content=('changes', 'population'), every=10, only_changes=True):
+        ...
+
+broadcast() feeds the frames of a run to several consumers at once, e.g. a renderer, a recorder and
+a statistics sink. every consumer has a queue of at most max_pending frames, the simulation waits while
+the slowest one is that far behind. a board is copied once per frame and the copy is shared by all of them.
+
+    asyncio.run(broadcast(life.run(1000), [renderer, recorder, stats]))
+'''
+import asyncio
+import functools
+import inspect
+import itertools
+from typing import Callable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+CONTENTS = ('board', 'changes', 'population')
+
+
+class Frame(NamedTuple):
+    generation: int
+    # the parts of the frame that were not asked for are None
+    board: Optional[object] = None
+    changes: Optional[List[Tuple[int, int]]] = None
+    population: Optional[int] = None
+
+
+def run(life, num_generations: Optional[int]=None, content: Union[str, Sequence[str]]='board',
+        every: int=1, only_changes: bool=False) -> Iterator[Frame]:
+    # the frame of the current generation, then one every `every` generations of the next num_generations
+    # (forever with None), and one of the last generation when num_generations isn't a multiple of `every`.
+    # with only_changes the frames of boards that didn't change since the previous
+    # frame are skipped.
+    # the board of a frame is the engine's own board for the engines that keep one, read it (or copy it)
+    # before asking for the next frame
+    content = (content,) if isinstance(content, str) else tuple(content)
+    for part in content:
+        if part not in CONTENTS:
+            raise ValueError(f"unknown frame content '{part}', use some of: {', '.join(CONTENTS)}")
+    if every < 1:
+        raise ValueError('every must be at least 1')
+
+    # the changes since the previous frame are only followed when needed, otherwise
+    # the engine can advance `every` generations at once (HashLife jumps ahead)
+    track_changes = 'changes' in content or only_changes
+    pending = set(life.live_cells()) if track_changes else None
+
+    def frame() -> Frame:
+        return Frame(
+            life.generation,
+            board=life.board if 'board' in content else None,
+            changes=list(pending) if 'changes' in content else None,
+            # counted by the engine, without listing the live cells
+            population=life.stats.population if 'population' in content else None,
+        )
+
+    yield frame()
+
+    steps = itertools.repeat(every)
+    if num_generations is not None:
+        steps = [every] * (num_generations // every)
+        if num_generations % every:
+            steps.append(num_generations % every)
+    for step in steps:
+        if track_changes:
+            pending.clear()
+            for _ in range(step):
+                life.compute_next_state()
+                # a cell that changed twice is back to where it was
+                pending.symmetric_difference_update(life.changed_cells())
+            if only_changes and not pending:
+                continue
+        else:
+            life.advance(step)
+        yield frame()
+
+
+async def broadcast(frames: Iterator[Frame], consumers: Sequence[Callable[[Frame], object]],
+                    max_pending: int=4) -> None:
+    # gives every frame to every consumer, in order. a consumer is a function or a coroutine function of a frame.
+    # the frames are computed in a thread of the default executor, so the consumers run while the next
+    # frame is computed. the first error of a consumer stops the run and is raised once all of them are done
+    loop = asyncio.get_running_loop()
+    queues = [asyncio.Queue(maxsize=max_pending) for _ in consumers]
+    errors = []
+
+    async def consume(consumer: Callable[[Frame], object], frames_in: asyncio.Queue) -> None:
+        try:
+            while True:
+                frame = await frames_in.get()
+                if frame is None:
+                    break
+                result = consumer(frame)
+                if inspect.isawaitable(result):
+                    await result
+        except Exception as e:
+            errors.append(e)
+            # keep taking frames so the simulation doesn't wait on a full queue
+            while await frames_in.get() is not None:
+                pass
+
+    tasks = [asyncio.ensure_future(consume(consumer, frames_in)) for consumer, frames_in in zip(consumers, queues)]
+    next_frame = functools.partial(_next_shared_frame, frames)
+    try:
+        while not errors:
+            frame = await loop.run_in_executor(None, next_frame)
+            if frame is None:
+                break
+            for frames_in in queues:
+                # waits while this consumer is max_pending frames behind
+                await frames_in.put(frame)
+    finally:
+        for frames_in in queues:
+            await frames_in.put(None)
+        await asyncio.gather(*tasks)
+
+    if errors:
+        raise errors[0]
+
+
+def _next_shared_frame(frames: Iterator[Frame]) -> Optional[Frame]:
+    # the next frame, with a copy of its board that stays the same while the simulation goes on
+    frame = next(frames, None)
+    if frame is not None and frame.board is not None:
+        frame = frame._replace(board=np.array(frame.board, dtype=np.uint8))
+    return frame
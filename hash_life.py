@@ -0,0 +1,352 @@
+'''
+HashLife: the universe is a quadtree whose equal sub-trees are shared (every node is
+canonical, there is only one node for each distinct pattern of a given size).
+The future of every node is memoized, so repeating patterns are computed once and
+a node of size 2^k can be advanced 2^(k-2) generations in one step.
+
+Cells live on an unbounded plane. num_rows x num_cols is the window, starting at (0, 0),
+that is exported by get_board().
+'''
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from life_game import Life
+from life_stats import LifeStats, cells_bounding_box
+from rules import CONWAY, Rule
+
+
+class Node:
+    # a square of 2^level x 2^level cells made of 4 quadrants of 2^(level-1) cells each.
+    # level 0 nodes are single cells and have no quadrants
+    __slots__ = ('level', 'nw', 'ne', 'sw', 'se', 'population')
+
+    def __init__(self, level: int, nw: Optional['Node'], ne: Optional['Node'],
+                 sw: Optional['Node'], se: Optional['Node'], population: int):
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+
+OFF = Node(0, None, None, None, None, 0)
+ON = Node(0, None, None, None, None, 1)
+
+
+class HashLife(Life):
+    # cells are never dropped at the edges of the window
+    unbounded = True
+
+    def __init__(self, num_rows: int=0, num_cols: int=0, cache_size: int=1 << 20, rule: Union[str, Rule]=CONWAY,
+                 boundary: str='dead'):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+
+        # max number of nodes kept in the canonical table and in the results memo.
+        # when it is exceeded, everything not reachable from the current universe is dropped
+        self.cache_size = cache_size
+
+        self._nodes: Dict[Tuple[Node, Node, Node, Node], Node] = {}
+        self._results: 'OrderedDict[Tuple[Node, int], Node]' = OrderedDict()
+        self._empty: List[Node] = [OFF]
+
+        self.generation = 0
+        self.rule = rule
+        self.boundary = boundary
+
+        # the universe, and the coordinates of its top-left cell
+        self._root = self._empty_node(3)
+        self._top = 0
+        self._left = 0
+        self._previous = (self._root, 0, 0)
+
+    @property
+    def board(self) -> List[List[int]]:
+        board = [
+            [0] * self.num_cols for _ in range(self.num_rows)
+        ]
+        for i, j in self.live_cells():
+            if 0 <= i < self.num_rows and 0 <= j < self.num_cols:
+                board[i][j] = 1
+        return board
+
+    @property
+    def population(self) -> int:
+        return self._root.population
+
+    def clear_board(self) -> None:
+        self._set_root(self._empty_node(3), 0, 0)
+        self._forget_changes()
+
+    def set_board_state(self, board: List[List[int]]) -> None:
+        self.num_rows = len(board)
+        self.num_cols = len(board[0])
+
+        cells = [
+            (i, j)
+            for i, row in enumerate(board)
+            for j, value in enumerate(row)
+            if value == 1
+        ]
+        self._set_cells(cells)
+        self._forget_changes()
+
+    def get_board(self) -> List[List[int]]:
+        return self.board
+
+    def compute_next_state(self) -> None:
+        self.advance(1)
+
+    def advance(self, num_generations: int) -> None:
+        # kept to find the changed cells when they are asked for
+        self._previous = (self._root, self._top, self._left)
+
+        # every set bit of num_generations is a jump of 2^j generations
+        j = 0
+        while num_generations > 0:
+            if num_generations & 1:
+                self._jump(j)
+            num_generations >>= 1
+            j += 1
+        self._record_stats()
+
+    def changed_cells(self) -> List[Tuple[int, int]]:
+        # cells that are different from before the last compute_next_state() or advance()
+        previous = set(self._live_cells(*self._previous))
+        return list(previous.symmetric_difference(self.live_cells()))
+
+    def live_cells(self) -> List[Tuple[int, int]]:
+        return list(self._live_cells(self._root, self._top, self._left))
+
+    @property
+    def stats(self) -> LifeStats:
+        # the nodes keep their population, births and deaths are found like changed_cells(),
+        # and cover all the generations of the last advance()
+        live = set(self.live_cells())
+        previous = set(self._live_cells(*self._previous))
+        return LifeStats(
+            self.generation, self.population, len(live - previous), len(previous - live), cells_bounding_box(live)
+        )
+
+    def _forget_changes(self) -> None:
+        # the changes of the last generation were on the old board, now nothing changed
+        self._previous = (self._root, self._top, self._left)
+
+    def _make_live(self, cells: List[Tuple[int, int]], i: int, j: int) -> None:
+        new_cells = [(i + cell[0], j + cell[1]) for cell in cells]
+        self._set_cells(self.live_cells() + new_cells)
+
+    def _check_rule(self, rule: Rule) -> None:
+        if rule.states > 2:
+            raise ValueError(f'{rule}: HashLife only runs rules with 2 states')
+        if 0 in rule.birth:
+            raise ValueError(f'{rule}: cells with no neighbours are born, every cell of the plane would be alive')
+
+        # the memoized futures were computed with the old rule
+        if getattr(self, '_results', None):
+            self._results.clear()
+
+    def _check_boundary(self, boundary: str) -> None:
+        if boundary != 'dead':
+            raise ValueError(f"HashLife runs on an unbounded plane, it has no edges to be '{boundary}'")
+
+    # building nodes
+
+    def _join(self, nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            node = Node(nw.level + 1, nw, ne, sw, se,
+                        nw.population + ne.population + sw.population + se.population)
+            self._nodes[key] = node
+        return node
+
+    def _empty_node(self, level: int) -> Node:
+        while len(self._empty) <= level:
+            e = self._empty[-1]
+            self._empty.append(self._join(e, e, e, e))
+        return self._empty[level]
+
+    def _expand(self, node: Node) -> Node:
+        # a node one level up with the given node in its centre
+        e = self._empty_node(node.level - 1)
+        return self._join(
+            self._join(e, e, e, node.nw),
+            self._join(e, e, node.ne, e),
+            self._join(e, node.sw, e, e),
+            self._join(node.se, e, e, e),
+        )
+
+    def _centre(self, node: Node) -> Node:
+        return self._join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def _build(self, cells: List[Tuple[int, int]], level: int, top: int, left: int) -> Node:
+        # quadtree of the 2^level square at (top, left) from the live cells inside of it
+        if not cells:
+            return self._empty_node(level)
+        if level == 0:
+            return ON
+
+        half = 1 << (level - 1)
+        quadrants = ([], [], [], [])
+        for i, j in cells:
+            quadrants[(i >= top + half) * 2 + (j >= left + half)].append((i, j))
+
+        return self._join(
+            self._build(quadrants[0], level - 1, top, left),
+            self._build(quadrants[1], level - 1, top, left + half),
+            self._build(quadrants[2], level - 1, top + half, left),
+            self._build(quadrants[3], level - 1, top + half, left + half),
+        )
+
+    def _set_cells(self, cells: List[Tuple[int, int]]) -> None:
+        # bottom and right are past the last row and column, like num_rows and num_cols
+        top = min([i for i, _ in cells] + [0])
+        left = min([j for _, j in cells] + [0])
+        bottom = max([i + 1 for i, _ in cells] + [self.num_rows])
+        right = max([j + 1 for _, j in cells] + [self.num_cols])
+
+        level = 3
+        while (1 << level) < max(bottom - top, right - left):
+            level += 1
+
+        self._set_root(self._build(cells, level, top, left), top, left)
+
+    def _set_root(self, root: Node, top: int, left: int) -> None:
+        self._root = root
+        self._top = top
+        self._left = left
+
+    def _live_cells(self, node: Node, top: int, left: int) -> Iterator[Tuple[int, int]]:
+        if node.population == 0:
+            return
+        if node.level == 0:
+            yield top, left
+            return
+
+        half = 1 << (node.level - 1)
+        yield from self._live_cells(node.nw, top, left)
+        yield from self._live_cells(node.ne, top, left + half)
+        yield from self._live_cells(node.sw, top + half, left)
+        yield from self._live_cells(node.se, top + half, left + half)
+
+    # computing the future
+
+    def _jump(self, j: int) -> None:
+        # advances the universe by 2^j generations
+
+        # make room until nothing alive can leave the part of the universe that is returned:
+        # all the cells are in the middle quarter of the root and 2^j is at most 1/8 of its size
+        root = self._root
+        while root.level < j + 3 or not self._has_empty_border(root):
+            self._top -= 1 << (root.level - 1)
+            self._left -= 1 << (root.level - 1)
+            root = self._expand(root)
+
+        self._root = self._successor(root, j)
+        self._top += 1 << (root.level - 2)
+        self._left += 1 << (root.level - 2)
+        self.generation += 1 << j
+
+        if len(self._nodes) > self.cache_size:
+            self._collect_garbage()
+
+    def _has_empty_border(self, node: Node) -> bool:
+        # true when all the live cells are in the middle quarter of the node
+        return node.population == (
+            node.nw.se.se.population +
+            node.ne.sw.sw.population +
+            node.sw.ne.ne.population +
+            node.se.nw.nw.population
+        )
+
+    def _successor(self, node: Node, j: int) -> Node:
+        # the centre of the node (one level down) 2^j generations later. needs j <= level - 2
+        if node.population == 0:
+            return self._empty_node(node.level - 1)
+
+        key = (node, j)
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            return result
+
+        if node.level == 2:
+            result = self._life_4x4(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            # the 9 overlapping sub-squares one level down
+            sub = [
+                nw,
+                self._join(nw.ne, ne.nw, nw.se, ne.sw),
+                ne,
+                self._join(nw.sw, nw.se, sw.nw, sw.ne),
+                self._join(nw.se, ne.sw, sw.ne, se.nw),
+                self._join(ne.sw, ne.se, se.nw, se.ne),
+                sw,
+                self._join(sw.ne, se.nw, sw.se, se.sw),
+                se,
+            ]
+
+            if j == node.level - 2:
+                # full speed: both halves of the jump go through the memoized successors
+                c = [self._successor(s, j - 1) for s in sub]
+                step = j - 1
+            else:
+                c = [self._centre(s) for s in sub]
+                step = j
+
+            result = self._join(
+                self._successor(self._join(c[0], c[1], c[3], c[4]), step),
+                self._successor(self._join(c[1], c[2], c[4], c[5]), step),
+                self._successor(self._join(c[3], c[4], c[6], c[7]), step),
+                self._successor(self._join(c[4], c[5], c[7], c[8]), step),
+            )
+
+        self._results[key] = result
+        if len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+
+        return result
+
+    def _life_4x4(self, node: Node) -> Node:
+        # one generation of the centre 2x2 of a 4x4 node
+        cells = [[0] * 4 for _ in range(4)]
+        for qi, quadrant in enumerate((node.nw, node.ne, node.sw, node.se)):
+            for ci, cell in enumerate((quadrant.nw, quadrant.ne, quadrant.sw, quadrant.se)):
+                cells[(qi // 2) * 2 + ci // 2][(qi % 2) * 2 + ci % 2] = cell.population
+
+        lookup = self.rule.lookup
+        centre = []
+        for i in (1, 2):
+            for j in (1, 2):
+                num_neighbours = sum(
+                    cells[i + di][j + dj]
+                    for di in (-1, 0, 1)
+                    for dj in (-1, 0, 1)
+                ) - cells[i][j]
+
+                centre.append(ON if lookup[cells[i][j]][num_neighbours] else OFF)
+
+        return self._join(*centre)
+
+    def _collect_garbage(self) -> None:
+        # keep only the nodes of the current universe, the memoized results are dropped
+        self._results.clear()
+
+        def keep(node: Node) -> None:
+            if node.level == 0:
+                return
+            key = (node.nw, node.ne, node.sw, node.se)
+            if key not in self._nodes:
+                self._nodes[key] = node
+                for child in key:
+                    keep(child)
+
+        empty_levels = len(self._empty)
+        self._nodes = {}
+        keep(self._root)
+
+        self._empty = [OFF]
+        self._empty_node(empty_levels - 1)
@@ -0,0 +1,223 @@
+'''
+renders a simulation straight to a video, without manim.
+every generation is drawn into a raw RGB frame and piped to ffmpeg (or saved as PNG files),
+so long runs don't pay for a scene graph and OpenGL per frame.
+
+    python headless_export.py glider_gun.mp4 --pattern glider_gun --generations 3000 --quality low
+    python headless_export.py frames/frame_%05d.png --pattern r_pentomino --generations 200
+
+with --checkpoint the simulation is saved every --checkpoint-every generations. running the same
+command again continues from the last checkpoint, the PNG frames keep the number of their generation.
+only PNG frames can be continued, ffmpeg would start the video over, so --checkpoint needs a PNG pattern.
+
+    python headless_export.py frames/frame_%05d.png --generations 100000 --checkpoint run.snap
+'''
+import argparse
+import os
+import queue
+import subprocess
+import threading
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import yaml
+from PIL import Image
+
+from boundary import BOUNDARIES
+from engines import ENGINES, create_life
+from life_game import Life
+from snapshot import Checkpointer
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'custom_config.yml')
+
+# same colors as AppLife: live cells, dead cells (black at 0.6 opacity over the background), background
+LIVE_COLOR = (0xec, 0xf0, 0xf1)
+DEAD_COLOR = (0x5e, 0x60, 0x60)
+BACKGROUND_COLOR = (0xec, 0xf0, 0xf1)
+
+# the patterns that can be exported, placed like in the AppLife scenes
+PATTERNS = {
+    'glider': lambda life: life.put_glider_at(life.num_rows // 3, life.num_cols // 3),
+    'r_pentomino': lambda life: life.put_r_pentomino(life.num_rows // 2, life.num_cols // 2),
+    'still_life': lambda life: life.put_still_life(),
+    'oscillators': lambda life: life.put_oscillators(),
+    'glider_gun': lambda life: life.put_glider_gun(life.num_rows // 2 - 5, life.num_cols // 5),
+    'copperhead': lambda life: life.put_copperhead(life.num_rows // 2 - 4, life.num_cols // 2 - 6),
+}
+
+
+def camera_quality(name: Optional[str]=None, config_path: str=CONFIG_PATH) -> Tuple[int, int, int]:
+    # (width, height, frame rate) of a quality from camera_qualities in custom_config.yml
+    with open(config_path) as f:
+        qualities = yaml.safe_load(f)['camera_qualities']
+
+    name = name or qualities['default_quality']
+    width, height = qualities[name]['resolution'].split('x')
+    return int(width), int(height), int(qualities[name]['frame_rate'])
+
+
+class FrameRenderer:
+    # draws boards into width x height RGB frames: every cell is a square of pixels,
+    # the board is centred and the rest of the frame is background
+
+    def __init__(self, num_rows: int, num_cols: int, width: int, height: int):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.width = width
+        self.height = height
+
+        cell_pixels = max(1, min(width // num_cols, height // num_rows))
+        top = (height - num_rows * cell_pixels) // 2
+        left = (width - num_cols * cell_pixels) // 2
+
+        # for every pixel, the row and column of its cell. pixels outside of the board
+        # point to an extra row / column that holds the background
+        self._pixel_rows = self._cell_index(height, top, cell_pixels, num_rows)
+        self._pixel_cols = self._cell_index(width, left, cell_pixels, num_cols)
+
+        self._palette = np.array([DEAD_COLOR, LIVE_COLOR, BACKGROUND_COLOR], dtype=np.uint8)
+        self._padded = np.full((num_rows + 1, num_cols + 1), 2, dtype=np.uint8)
+
+    def render(self, board) -> np.ndarray:
+        # dying cells of Generations rules are drawn as dead
+        self._padded[:self.num_rows, :self.num_cols] = np.asarray(board) == 1
+        cells = self._padded[self._pixel_rows[:, None], self._pixel_cols[None, :]]
+        return self._palette[cells]
+
+    @staticmethod
+    def _cell_index(size: int, offset: int, cell_pixels: int, num_cells: int) -> np.ndarray:
+        index = (np.arange(size) - offset) // cell_pixels
+        index[(index < 0) | (index >= num_cells)] = num_cells
+        return index
+
+
+class FFmpegWriter:
+    # raw RGB frames in, video out
+
+    def __init__(self, path: str, width: int, height: int, frame_rate: int):
+        command = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+            '-s', f'{width}x{height}', '-r', str(frame_rate),
+            '-i', '-',
+        ]
+        if not path.endswith('.gif'):
+            command += ['-pix_fmt', 'yuv420p']
+        command.append(path)
+
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, frame: np.ndarray) -> None:
+        self._process.stdin.write(frame.tobytes())
+
+    def close(self) -> None:
+        self._process.stdin.close()
+        if self._process.wait() != 0:
+            raise RuntimeError(f'ffmpeg exited with code {self._process.returncode}')
+
+
+class PNGWriter:
+    # one PNG per frame, path is a pattern like 'frames/frame_%05d.png'
+
+    def __init__(self, path: str, first_frame: int=0):
+        self.path = path
+        self.frame = first_frame
+
+        directory = os.path.dirname(path % 0)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, frame: np.ndarray) -> None:
+        Image.fromarray(frame).save(self.path % self.frame)
+        self.frame += 1
+
+    def close(self) -> None:
+        pass
+
+
+def export(life: Life, num_generations: int, path: str, quality: Optional[str]=None,
+           queue_size: int=32, on_generation: Optional[Callable[[int], None]]=None,
+           checkpoint: Optional[Checkpointer]=None) -> None:
+    # writes the current board and the next num_generations - 1 generations, one frame each.
+    # the simulation runs in this thread and the frames are encoded in another one,
+    # with at most queue_size frames waiting in between.
+    # PNG frames are numbered by life.generation, so a run restored from a checkpoint continues the numbers
+    width, height, frame_rate = camera_quality(quality)
+    renderer = FrameRenderer(life.num_rows, life.num_cols, width, height)
+
+    if path.endswith('.png'):
+        writer = PNGWriter(path, first_frame=life.generation)
+    else:
+        writer = FFmpegWriter(path, width, height, frame_rate)
+
+    frames: queue.Queue = queue.Queue(maxsize=queue_size)
+    errors = []
+
+    def encode() -> None:
+        try:
+            while True:
+                frame = frames.get()
+                if frame is None:
+                    break
+                writer.write(frame)
+        except Exception as e:
+            errors.append(e)
+            # keep taking frames so the simulation doesn't block on a full queue
+            while frames.get() is not None:
+                pass
+
+    encoder = threading.Thread(target=encode, daemon=True)
+    encoder.start()
+
+    try:
+        for generation in range(num_generations):
+            # blocks while the encoder is queue_size frames behind
+            frames.put(renderer.render(life.board))
+            if errors:
+                break
+            if on_generation is not None:
+                on_generation(generation)
+            if generation < num_generations - 1:
+                life.compute_next_state()
+                if checkpoint is not None:
+                    checkpoint.update(life)
+    finally:
+        frames.put(None)
+        encoder.join()
+        writer.close()
+
+    if errors:
+        raise errors[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='render a Game of Life simulation to a video without manim')
+    parser.add_argument('output', help='video file for ffmpeg (.mp4, .gif, ...) or a PNG pattern like frames/%%05d.png')
+    parser.add_argument('--pattern', choices=sorted(PATTERNS), default='glider_gun')
+    parser.add_argument('--generations', type=int, default=300)
+    parser.add_argument('--rows', type=int, default=40)
+    parser.add_argument('--cols', type=int, default=72)
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='numpy')
+    parser.add_argument('--quality', help='one of camera_qualities in custom_config.yml')
+    parser.add_argument('--rule', default='B3/S23', help='rule string like B36/S23 or B2/S/C3, see rules.py')
+    parser.add_argument('--boundary', choices=BOUNDARIES, default='dead',
+                        help='what is outside of the edges of the board, see boundary.py')
+    parser.add_argument('--checkpoint', help='snapshot file to save the simulation to and to continue from')
+    parser.add_argument('--checkpoint-every', type=int, default=1000, help='generations between checkpoints')
+    args = parser.parse_args()
+    if args.checkpoint and not args.output.endswith('.png'):
+        parser.error('--checkpoint continues numbered PNG frames, use a pattern like frames/%05d.png as output')
+
+    life = create_life(args.rows, args.cols, engine=args.engine, rule=args.rule, boundary=args.boundary)
+
+    checkpoint = None
+    if args.checkpoint:
+        checkpoint = Checkpointer(args.checkpoint, every_generations=args.checkpoint_every)
+    if checkpoint is None or not checkpoint.restore(life):
+        PATTERNS[args.pattern](life)
+
+    export(life, args.generations - life.generation, args.output, quality=args.quality, checkpoint=checkpoint)
+
+
+if __name__ == '__main__':
+    main()
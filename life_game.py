@@ -1,22 +1,112 @@
 import pprint
-from typing import List, Tuple
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 from assets.head_to_life_board import AsciiToBoard
+from boundary import BOUNDARIES, halo_cells
+from cycle_detection import CycleDetector, Stabilization
+from frame_stream import Frame, run
+from life_stats import LifeStats, bounding_box
+from pattern_io import find_pattern, load_pattern
+from pattern_library import pattern_mask, stamp
+from rules import CONWAY, Rule, parse_rule
 
 
 class Life:
-    def __init__(self, num_rows: int=0, num_cols: int=0):
+    # engines that don't set a rule play the Game of Life
+    _rule = CONWAY
+    # and have dead cells outside of the board
+    _boundary = 'dead'
+    # the live cells with a halo around them, built when a generation needs it. see _make_padded()
+    _padded: Optional[List[List[int]]] = None
+    # the stats of the last generations, once track_stats() was called
+    _stats_history: Optional[Deque[LifeStats]] = None
+
+    def __init__(self, num_rows: int=0, num_cols: int=0, tile_size: int=16, rule: Union[str, Rule]=CONWAY,
+                 boundary: str='dead'):
         self.num_rows = num_rows
         self.num_cols = num_cols
+        # number of generations computed since the engine was created
+        self.generation = 0
+        self.rule = rule
+        self.boundary = boundary
 
         self.board = [
             [0] * num_cols for _ in range(num_rows)
         ]
 
+        # the board is divided in tile_size x tile_size tiles. a cell can only change if it
+        # or one of its neighbours changed in the last generation, so only the tiles with
+        # changes and the tiles around them are computed in the next generation
+        self.tile_size = tile_size
+        self._active_tiles: Set[Tuple[int, int]] = set()
+        # the tiles that may have cells that aren't dead: the tiles of the cells changed since the board was
+        # last cleared. clearing the board and listing the live cells only look at these tiles
+        self._occupied_tiles: Set[Tuple[int, int]] = set()
+
+        # cells that changed in the last generation
+        self._changed_cells: List[Tuple[int, int]] = []
+
+        # buffers reused by every generation, so that a generation only allocates the (i, j) of the
+        # cells that change: the tiles of the next generation, swapped with _active_tiles,
+        # the changed cells and their next states, and the tiles of the changed cells
+        self._next_tiles: Set[Tuple[int, int]] = set()
+        self._changes: List[Tuple[int, int]] = []
+        self._next_states: List[int] = []
+        self._changed_tiles: Set[Tuple[int, int]] = set()
+
+        # number of live cells in every row and in every column, kept up as cells change for the stats
+        self._row_population = [0] * num_rows
+        self._col_population = [0] * num_cols
+
+    @property
+    def rule(self) -> Rule:
+        # see rules.py. can be set to a Rule, a rule string like 'B36/S23' or a name like 'highlife'
+        return self._rule
+
+    @rule.setter
+    def rule(self, rule: Union[str, Rule]) -> None:
+        rule = parse_rule(rule)
+        self._check_rule(rule)
+        self._rule = rule
+
+    @property
+    def boundary(self) -> str:
+        # what is outside of the edges of the board, one of 'dead', 'torus', 'klein' or 'mirror'. see boundary.py
+        return self._boundary
+
+    @boundary.setter
+    def boundary(self, boundary: str) -> None:
+        if boundary not in BOUNDARIES:
+            raise ValueError(f"unknown boundary '{boundary}', use one of: {', '.join(BOUNDARIES)}")
+        self._check_boundary(boundary)
+        self._boundary = boundary
+        # the halo of the padded board depends on the boundary
+        self._padded = None
+
     def clear_board(self) -> None:
-        for i in range(self.num_rows):
-            for j in range(self.num_cols):
-                self.board[i][j] = 0
+        # zeroes the occupied tiles only, a row of a tile at a time, in the board and in the padded board
+        board, padded = self.board, self._padded
+        for i, spans in self._occupied_rows():
+            for start, stop in spans:
+                zeros = [0] * (stop - start)
+                board[i][start:stop] = zeros
+                if padded is not None:
+                    padded[i + 1][start + 1:stop + 1] = zeros
+
+        if padded is not None and self.boundary != 'dead':
+            # and the images of the edges in the halo
+            padded[0][:] = padded[-1][:] = [0] * (self.num_cols + 2)
+            for row in padded:
+                row[0] = row[-1] = 0
+
+        # an empty board never changes
+        self._active_tiles.clear()
+        self._occupied_tiles.clear()
+        # and has no changes of the last generation
+        self._changed_cells.clear()
+        self._row_population = [0] * self.num_rows
+        self._col_population = [0] * self.num_cols
 
     def set_board_state(self, board: List[List[int]]) -> None:
         # make a deep copy, to avoid bugs?
@@ -27,10 +117,10 @@ class Life:
 
         # if dimensions of both are same, then overwrite values
         if len(self.board) == len(board) and len(self.board[0]) == len(board[0]):
-            # or manually set the values in old array, to avoid memory leak of pointing to new array
-            for i in range(len(board)):
-                for j in range(len(board[0])):
-                    self.board[i][j] = board[i][j]
+            # or manually set the values in old array, to avoid memory leak of pointing to new array.
+            # a slice assignment copies a whole row at once
+            for row, values in zip(self.board, board):
+                row[:] = values
 
         else:
             # otherwise, delete old one and add new
@@ -39,128 +129,307 @@ class Life:
             self.num_rows = len(self.board)
             self.num_cols = len(self.board[0])
 
+        self._activate_all_tiles()
+        # every tile of the rows with cells
+        size = self.tile_size
+        self._occupied_tiles = {
+            (i // size, tj)
+            for i, row in enumerate(self.board) if any(row)
+            for tj in range(-(-self.num_cols // size))
+        }
+        self._row_population = [row.count(1) for row in self.board]
+        self._col_population = [column.count(1) for column in zip(*self.board)]
+        self._padded = None
+        # the changes of the last generation were on the old board
+        self._changed_cells.clear()
+
     def get_board(self) -> List[List[int]]:
         return self.board
 
-    def compute_next_state(self) -> None:
-        # compute the next state based on the rules of game of life
-
-        # TODO: won't this be memory intensive? Should we use the trick to use O(1) space?
-        # make a copy of current state
-        board_copy = [
-            row[:] for row in self.board
-        ]
-
-        for i in range(self.num_rows):
-            for j in range(self.num_cols):
-                num_neighbours = self._count_neighbours(board_copy, i, j)
-
-                if self.board[i][j] == 1 and num_neighbours not in [2,3]:
-                    # an alive cell changes its state to dead if neighbours count is other than 2 or 3
-                    self.board[i][j] = 0
-                elif self.board[i][j] == 0 and num_neighbours == 3:
-                    # a dead cell is brought to life with exactly 3 neighbours
-                    self.board[i][j] = 1
-
-    def _count_neighbours(self, board_copy: List[List[int]], i: int, j: int) -> int:
-        neighbours = [
-            # indexes of matrix with (0,0) as the first Top-Left element
-            (-1, -1),
-            (-1, 0),
-            (-1, 1),
-            (0, -1),
-            # (0, 0),  # itself
-            (0, 1),
-            (1, -1),
-            (1, 0),
-            (1, 1)
-        ]
-
-        num_neighbours = 0
+    def live_cells(self) -> List[Tuple[int, int]]:
+        # row by row, only in the occupied tiles
+        board = self.board
+        cells = []
+        for i, spans in self._occupied_rows():
+            row = board[i]
+            for start, stop in spans:
+                cells.extend((i, j) for j in range(start, stop) if row[j] == 1)
+        return cells
+
+    def changed_cells(self) -> List[Tuple[int, int]]:
+        # (i, j) of the cells that were born or died in the last generation
+        return list(self._changed_cells)
+
+    @property
+    def stats(self) -> LifeStats:
+        # the population, bounding box, births and deaths of the current generation, see life_stats.py
+        board = self.board
+        births = sum(1 for i, j in self._changed_cells if board[i][j] == 1)
+        return LifeStats(
+            self.generation, sum(self._row_population), births, len(self._changed_cells) - births,
+            bounding_box(self._row_population, self._col_population),
+        )
 
-        for neigh in neighbours:
-            # i, j are indexes of the cell for which we're counting neighbours
-            # ii, jj are indexes of current neighbour
-            ii = i + neigh[0]
-            jj = j + neigh[1]
+    @property
+    def stats_history(self) -> List[LifeStats]:
+        # the stats of the last generations, oldest first. empty until track_stats() is called
+        return list(self._stats_history or ())
 
-            if 0 <= ii < len(board_copy) and 0 <= jj < len(board_copy[0]):
-                num_neighbours += board_copy[ii][jj]
+    def track_stats(self, history_size: int=1024) -> None:
+        # keeps the stats of every generation computed from now on, up to history_size of them.
+        # 0 stops keeping them
+        self._stats_history = deque(maxlen=history_size) if history_size > 0 else None
 
-        return num_neighbours
+    def compute_next_state(self) -> None:
+        # compute the next state based on the rule, B3/S23 for the game of life
+
+        # first find the cells that change, then change them. this way every cell
+        # counts its neighbours on the current state and the board doesn't need a copy
+        changed_cells = self._changes
+        next_states = self._next_states
+        # with Generations rules cells also change between the dying states, only the cells
+        # that became alive or stopped being alive are returned by changed_cells()
+        born_or_died = self._changed_cells
+        changed_cells.clear()
+        next_states.clear()
+        born_or_died.clear()
+        lookup = self.rule.lookup
+        board = self.board
+
+        if 0 in self.rule.birth:
+            # cells with no live neighbours are born, so nothing stays still
+            self._activate_all_tiles()
+
+        if self._padded is None:
+            self._padded = self._make_padded()
+        padded = self._padded
+        tile_rows, tile_cols = self._tile_rows, self._tile_cols
+
+        for ti, tj in self._active_tiles:
+            cols = tile_cols[tj]
+            for i in tile_rows[ti]:
+                # cell i, j is at padded[i + 1][j + 1], so its 8 neighbours are always in padded
+                # and no index has to be checked, whatever the boundary
+                above, row, below = padded[i], padded[i + 1], padded[i + 2]
+                states = board[i]
+                for j in cols:
+                    num_neighbours = (
+                        above[j] + above[j + 1] + above[j + 2] +
+                        row[j] + row[j + 2] +
+                        below[j] + below[j + 1] + below[j + 2]
+                    )
+
+                    state = states[j]
+                    next_state = lookup[state][num_neighbours]
+                    if next_state != state:
+                        changed_cells.append((i, j))
+                        next_states.append(next_state)
+                        if state == 1 or next_state == 1:
+                            born_or_died.append((i, j))
+
+        for (i, j), next_state in zip(changed_cells, next_states):
+            board[i][j] = next_state
+
+        # the images in the halo of the cells on the edges, their neighbours across the edge are computed as well
+        # and the live cells of every row and column are counted for the stats
+        set_padded = self._set_padded
+        row_population, col_population = self._row_population, self._col_population
+        for i, j in born_or_died:
+            if board[i][j] == 1:
+                changed_cells.extend(set_padded(i, j, 1))
+                row_population[i] += 1
+                col_population[j] += 1
+            else:
+                changed_cells.extend(set_padded(i, j, 0))
+                row_population[i] -= 1
+                col_population[j] -= 1
+
+        self._active_tiles, self._next_tiles = self._next_tiles, self._active_tiles
+        self._active_tiles.clear()
+        self._activate_tiles_around(changed_cells)
+        self.generation += 1
+        self._record_stats()
+
+    def advance(self, num_generations: int) -> None:
+        # move the board num_generations generations forward
+        for _ in range(num_generations):
+            self.compute_next_state()
+
+    def advance_until_stable(self, max_generations: int, history_size: int=4096) -> Optional[Stabilization]:
+        # like advance(max_generations), but stops as soon as the board dies out or repeats itself.
+        # returns what happened (print it for e.g. 'period-2 oscillator from gen 12') or None if it didn't stabilize
+        detector = CycleDetector(self, history_size)
+        for _ in range(max_generations):
+            self.compute_next_state()
+            stabilization = detector.update(self)
+            if stabilization is not None:
+                return stabilization
+        return None
+
+    def run(self, num_generations: Optional[int]=None, content: Union[str, Sequence[str]]='board',
+            every: int=1, only_changes: bool=False) -> Iterator[Frame]:
+        # a lazy generator of the frames of the next generations: boards, changed cells and/or populations,
+        # every `every` generations. see frame_stream.py, and frame_stream.broadcast() for several consumers
+        return run(self, num_generations, content, every, only_changes)
+
+    def save_snapshot(self, path: str, encoding: Optional[str]=None) -> None:
+        # writes the board, its size, the generation, the rule and the engine to a binary file
+        from snapshot import save_snapshot
+        save_snapshot(self, path, encoding)
+
+    def load_snapshot(self, path: str) -> None:
+        # puts the board and the generation of a snapshot on this engine
+        from snapshot import load_snapshot
+        load_snapshot(path, life=self)
+
+    def _make_padded(self) -> List[List[int]]:
+        # 1 for the live cells of the board and 0 for the others, with a halo of one cell on each side:
+        # cell i, j is at [i + 1][j + 1]. only live cells count, not the dying ones of Generations rules
+        padded = [[0] * (self.num_cols + 2)]
+        two_states = self.rule.states == 2
+        for row in self.board:
+            # with 2 states the board only has 0 and 1, the row is copied as it is
+            padded.append([0, *row, 0] if two_states else [0] + [1 if value == 1 else 0 for value in row] + [0])
+        padded.append([0] * (self.num_cols + 2))
+
+        # the halo holds the cells on the edges, as the boundary says
+        self._halo = halo_cells(self.num_rows, self.num_cols, self.boundary)
+        for (i, j), images in self._halo.items():
+            for ii, jj in images:
+                padded[ii + 1][jj + 1] = padded[i + 1][j + 1]
+
+        # the rows and columns of every tile, computed once for the size of the board
+        size = self.tile_size
+        self._tile_rows = [range(i, min(i + size, self.num_rows)) for i in range(0, self.num_rows, size)]
+        self._tile_cols = [range(j, min(j + size, self.num_cols)) for j in range(0, self.num_cols, size)]
+        return padded
+
+    def _set_padded(self, i: int, j: int, live: int) -> Sequence[Tuple[int, int]]:
+        # updates cell i, j of the padded board and its images in the halo, returns the images
+        padded = self._padded
+        if padded is None:
+            return ()
+
+        padded[i + 1][j + 1] = live
+        images = self._halo.get((i, j), ())
+        for ii, jj in images:
+            padded[ii + 1][jj + 1] = live
+        return images
+
+    def _record_stats(self) -> None:
+        # called by every engine once it computed a generation
+        if self._stats_history is not None:
+            self._stats_history.append(self.stats)
+
+    def _check_rule(self, rule: Rule) -> None:
+        # engines that can't run some rules raise a ValueError here
+        pass
+
+    def _check_boundary(self, boundary: str) -> None:
+        # and engines without edges, or that can't wrap around them, here
+        pass
 
     def _make_live(self, cells: List[Tuple[int, int]], i: int, j: int) -> None:
         # for the given cells' indexes relative to i,j... sets the value of these cells to 1
+        live_cells = []
         for cell in cells:
             ii = i + cell[0]
             jj = j + cell[1]
+            was_live = self.board[ii][jj] == 1
             self.board[ii][jj] = 1
+            # negative indexes count from the end of the row / column
+            ii %= self.num_rows
+            jj %= self.num_cols
+            if not was_live:
+                self._row_population[ii] += 1
+                self._col_population[jj] += 1
+            live_cells.append((ii, jj))
+
+        # the padded board is built first, on a new board or after set_board_state() or a change of boundary
+        # the images of the cells on the edges in the halo are needed to wake up the tiles across the edges
+        if self._padded is None:
+            self._padded = self._make_padded()
+        for ii, jj in list(live_cells):
+            live_cells += self._set_padded(ii, jj, 1)
+        self._activate_tiles_around(live_cells)
+
+    def _occupied_rows(self) -> Iterator[Tuple[int, List[Tuple[int, int]]]]:
+        # in order, every row of the occupied tiles and the (start, stop) columns of its occupied tiles
+        size = self.tile_size
+        tiles_of_row: Dict[int, List[int]] = {}
+        for ti, tj in self._occupied_tiles:
+            tiles_of_row.setdefault(ti, []).append(tj)
+
+        for ti in sorted(tiles_of_row):
+            spans = [(tj * size, min((tj + 1) * size, self.num_cols)) for tj in sorted(tiles_of_row[ti])]
+            for i in range(ti * size, min((ti + 1) * size, self.num_rows)):
+                yield i, spans
+
+    def _activate_all_tiles(self) -> None:
+        self._active_tiles = {
+            (ti, tj)
+            for ti in range(-(-self.num_rows // self.tile_size))
+            for tj in range(-(-self.num_cols // self.tile_size))
+        }
+
+    def _activate_tiles_around(self, cells: List[Tuple[int, int]]) -> None:
+        # the tiles of the given cells and the 8 tiles around each of them
+        # need to be computed in the next generation
+        size = self.tile_size
+        tile_rows = -(-self.num_rows // size)
+        tile_cols = -(-self.num_cols // size)
+
+        changed_tiles = self._changed_tiles
+        changed_tiles.clear()
+        for i, j in cells:
+            changed_tiles.add((i // size, j // size))
+        # the images in the halo are outside of the board
+        self._occupied_tiles.update(
+            (ti, tj) for ti, tj in changed_tiles if 0 <= ti < tile_rows and 0 <= tj < tile_cols
+        )
+
+        active_tiles = self._active_tiles
+        for ti, tj in changed_tiles:
+            for ii in range(max(ti - 1, 0), min(ti + 2, tile_rows)):
+                for jj in range(max(tj - 1, 0), min(tj + 2, tile_cols)):
+                    active_tiles.add((ii, jj))
+
+    def stamp(self, patterns: Union[str, Sequence[str]], positions, orientations=0) -> None:
+        # puts many patterns at once: patterns[k] (a name from pattern_library, like 'glider') in
+        # orientations[k] (0 to 7, see pattern_library.ORIENTATIONS) with its top-left at positions[k].
+        # a single name or orientation is used for all the positions. cells outside of the board are dropped
+        stamp(self, patterns, positions, orientations)
 
     def put_glider_at(self, i: int, j: int) -> None:
         # will put a glider in the 3x3 box whose 0,0 will be positioned at i,j
         # precaution: clear the board, this method just overwrites the new values.
         # this glider will face bottom-right
-        cells = [
-            (0, 1),
-            (1, 2),
-            (2, 0),
-            (2, 1),
-            (2, 2),
-        ]
-        self._make_live(cells, i, j)
+        self.stamp('glider', [(i, j)])
 
     def put_underpopulation_example(self, i: int, j: int) -> None:
         # note: clear the grid before this step
         # this method puts an L-pentomino at given i,j
-        cells = [
-            (0, 4),
-            (2, 0),
-            (2, 1),
-            (3, 0),
-            (3, 1),
-        ]
-
-        self._make_live(cells, i, j)
+        self.stamp('underpopulation_example', [(i, j)])
 
     def put_survival_example(self, i: int, j: int) -> None:
         # use a Tub (as described on wikipedia under "still life")
-        cells = [
-            (0, 1),
-            (1, 0),
-            (1, 2),
-            (2, 1)
-        ]
-        self._make_live(cells, i, j)
+        self.stamp('tub', [(i, j)])
 
     def put_overpopulation_example(self, i: int, j: int) -> None:
         # it is a Z-pentomino
-        cells = [
-            (0, 0),
-            (0, 1),
-            (1, 1),
-            (2, 1),
-            (2, 2)
-        ]
-        self._make_live(cells, i, j)
+        self.stamp('overpopulation_example', [(i, j)])
 
     def put_reproduction_example(self, i: int, j: int) -> None:
         # a 3 cell group
-        cells = [
-            (0, 0),
-            (1, 0),
-            (1, 1)
-        ]
-        self._make_live(cells, i, j)
+        self.stamp('reproduction_example', [(i, j)])
 
     def put_r_pentomino(self, i: int, j: int) -> None:
-        cells = [
-            (0, 1),
-            (0, 2),
-            (1, 0),
-            (1, 1),
-            (2, 1)
-        ]
-        self._make_live(cells, i, j)
+        self.stamp('r_pentomino', [(i, j)])
+
+    def put_pattern(self, name: str, i: int=0, j: int=0) -> None:
+        # puts a pattern file (.rle, .cells, .mc) with its top-left at i,j.
+        # name is a path, or the name of a pattern in the patterns directory like 'glider_gun'
+        load_pattern(self, find_pattern(name), i, j)
 
     def meme_head(self):
 
@@ -169,195 +438,34 @@ class Life:
         )
 
     def put_still_life(self):
-        # block
-        block = [
-            (0, 0),
-            (0, 1),
-            (1, 0),
-            (1, 1)
-        ]
-
-        beeHive = [
-            (0, 1),
-            (0, 2),
-            (1, 0),
-            (1, 3),
-            (2, 1),
-            (2, 2)
-        ]
-
-        loaf = [
-            (0, 1),
-            (0, 2),
-            (1, 0),
-            (1, 3),
-            (2, 1),
-            (2, 3),
-            (3, 2)
-        ]
-
-        boat = [
-            (0, 0),
-            (0, 1),
-            (1, 0),
-            (1, 2),
-            (2, 1)
-        ]
-
-        tub = [
-            (0, 1),
-            (1, 0),
-            (1, 2),
-            (2, 1)
-        ]
-        shapes = [block, beeHive, loaf, boat, tub]
+        shapes = ['block', 'beehive', 'loaf', 'boat', 'tub']
 
         # divide the board width into 6 parts
         # 6 parts contain 5 mid points. we'll place each shape at one of those points
         part_j = self.num_cols // (len(shapes) + 1)
         part_i = self.num_rows // 2  # center vertical
 
-        for idx, shape in enumerate(shapes):
-            self._make_live(shape, i=part_i, j=part_j*(idx+1))
+        self.stamp(shapes, [(part_i, part_j * (idx + 1)) for idx in range(len(shapes))])
 
     def put_oscillators(self):
-        # period 2
-        blinker = [
-            (0, 0),
-            (0, 1),
-            (0, 2)
-        ]
-
-        # period 2
-        toad = [
-            (0, 1),
-            (0, 2),
-            (0, 3),
-            (1, 0),
-            (1, 1),
-            (1, 2)
-        ]
-
-        # period 2
-        beacon = [
-            (0, 0),
-            (0, 1),
-            (1, 0),
-            (1, 1),
-            (2, 2),
-            (2, 3),
-            (3, 2),
-            (3, 3)
-        ]
-
-        penta_decathlon = [
-            (0, 1),
-            (1, 1),
-            (2, 0),
-            (2, 2),
-            (3, 1),
-            (4, 1),
-            (5, 1),
-            (6, 1),
-            (7, 0),
-            (7, 2),
-            (8, 1),
-            (9, 1)
-        ]
-
-        shapes = [blinker, toad, beacon, penta_decathlon]
+        # period 2: blinker, toad, beacon. period 15: penta-decathlon
+        shapes = ['blinker', 'toad', 'beacon', 'pentadecathlon']
 
         i = self.num_rows // 2  # center vertical
         j = self.num_cols // (len(shapes) + 1)
 
+        positions = []
         for idx, shape in enumerate(shapes):
-            next_i = i - len(shape)//3  # adjust the height
+            next_i = i - int(pattern_mask(shape).sum()) // 3  # adjust the height
             next_j = j * (idx + 1)
-            self._make_live(shape, i=next_i, j=next_j)
+            positions.append((next_i, next_j))
+        self.stamp(shapes, positions)
 
     def put_copperhead(self, i, j):
-        cells = [
-            (0, 5),
-            (0, 7),
-            (0, 8),
-            (1, 4),
-            (1, 11),
-
-            (2, 3),
-            (2, 4),
-            (2, 8),
-            (2, 11),
-
-            (3, 0),
-            (3, 1),
-            (3, 3),
-            (3, 9),
-            (3, 10),
-            (4, 0),
-            (4, 1),
-            (4, 3),
-            (4, 9),
-            (4, 10),
-
-            (5, 3),
-            (5, 4),
-            (5, 8),
-            (5, 11),
-
-            (6, 4),
-            (6, 11),
-
-            (7, 5),
-            (7, 7),
-            (7, 8)
-        ]
-        self._make_live(cells, i, j)
+        self.stamp('copperhead', [(i, j)])
 
     def put_glider_gun(self, i, j):
-        cells = [
-            (4, 0),
-            (5, 0),
-            (4, 1),
-            (5, 1),
-
-            (4, 10),
-            (5, 10),
-            (6, 10),
-            (3, 11),
-            (7, 11),
-            (2, 12),
-            (8, 12),
-            (2, 13),
-            (8, 13),
-            (5, 14),
-            (3, 15),
-            (7, 15),
-            (4, 16),
-            (5, 16),
-            (6, 16),
-            (5, 17),
-
-            (2, 20),
-            (3, 20),
-            (4, 20),
-            (2, 21),
-            (3, 21),
-            (4, 21),
-            (1, 22),
-            (5, 22),
-
-            (0, 24),
-            (1, 24),
-            (5, 24),
-            (6, 24),
-
-            (2, 34),
-            (3, 34),
-            (2, 35),
-            (3, 35)
-        ]
-
-        self._make_live(cells, i, j)
+        self.stamp('glider_gun', [(i, j)])
 
 if __name__ == '__main__':
     board = [[0, 1, 0], [0, 0, 1], [1, 1, 1], [0, 0, 0]]
@@ -0,0 +1,80 @@
+'''
+statistics of a board for dashboards: the population, the bounding box of the live cells and the
+births and deaths of the last generation.
+
+life.stats is the LifeStats of the current generation. every engine gets it from what it keeps for its
+step: the list engine counts the live cells of every row and column as it changes them, sparse and hash
+use their live cells. the array engines count a generation once, when its stats are first asked for.
+
+life.track_stats(history_size) also keeps the stats of the last history_size generations in
+life.stats_history, oldest first. while stats are tracked the array engines count them as part of the step:
+numpy and bit add the births and deaths of the changed cells they found to the population, parallel adds
+up the stats of the bands of its workers and memmap the stats of every band while it is in memory.
+'''
+from typing import Iterable, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# top, left, bottom, right. bottom and right are the last row and column with live cells
+BoundingBox = Tuple[int, int, int, int]
+
+
+class LifeStats(NamedTuple):
+    generation: int
+    population: int
+    # the cells of changed_cells() that are live now, and the ones that aren't
+    births: int
+    deaths: int
+    # None without live cells
+    bbox: Optional[BoundingBox]
+
+
+def bounding_box(rows: Sequence, cols: Sequence) -> Optional[BoundingBox]:
+    # from the number of live cells (or if there are any) in every row and in every column
+    rows = np.flatnonzero(rows)
+    cols = np.flatnonzero(cols)
+    if not len(rows):
+        return None
+    return int(rows[0]), int(cols[0]), int(rows[-1]), int(cols[-1])
+
+
+def cells_bounding_box(cells: Iterable[Tuple[int, int]]) -> Optional[BoundingBox]:
+    cells = list(cells)
+    if not cells:
+        return None
+    rows, cols = zip(*cells)
+    return min(rows), min(cols), max(rows), max(cols)
+
+
+def array_stats(generation: int, live: np.ndarray, changed: Optional[np.ndarray], first_row: int=0) -> LifeStats:
+    # from boolean arrays of the live cells and of the cells changed in the last generation (None when unknown).
+    # the rows of the arrays start at first_row of the board
+    population = int(np.count_nonzero(live))
+    births = deaths = 0
+    if changed is not None:
+        births = int(np.count_nonzero(changed & live))
+        deaths = int(np.count_nonzero(changed)) - births
+
+    bbox = bounding_box(live.any(axis=1), live.any(axis=0))
+    if bbox is not None:
+        top, left, bottom, right = bbox
+        bbox = (top + first_row, left, bottom + first_row, right)
+    return LifeStats(generation, population, births, deaths, bbox)
+
+
+def combined_stats(generation: int, parts: Iterable[LifeStats]) -> LifeStats:
+    # the stats of a board from the stats of its parts, with their bounding boxes in the coordinates of the board
+    population = births = deaths = 0
+    boxes = []
+    for part in parts:
+        population += part.population
+        births += part.births
+        deaths += part.deaths
+        if part.bbox is not None:
+            boxes.append(part.bbox)
+
+    bbox = None
+    if boxes:
+        tops, lefts, bottoms, rights = zip(*boxes)
+        bbox = (min(tops), min(lefts), max(bottoms), max(rights))
+    return LifeStats(generation, population, births, deaths, bbox)
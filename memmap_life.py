@@ -0,0 +1,229 @@
+'''
+Boards larger than RAM. The board and the next board are numpy.memmap files in a directory,
+a generation reads the board a band of rows at a time (with a halo of one cell around it)
+and writes the band of the next board, so only a few bands are in memory at once and the
+files are read and written sequentially.
+
+The directory also holds state.json, which says which of the two files is the current board
+and its generation. It is replaced after every generation, so a run that is killed halfway
+can be resumed from the last complete generation with MemmapLife.resume(directory).
+'''
+import json
+import os
+import shutil
+import tempfile
+import weakref
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from life_stats import LifeStats, array_stats, combined_stats
+from numpy_life import NumpyLife, born_or_died, fill_padded, live_cells_of, next_generation, padded_neighbour_counts
+from rules import CONWAY, Rule
+
+STATE_FILE = 'state.json'
+BOARD_FILES = ('board_0.u8', 'board_1.u8')
+
+# size of the rows read at once, in bytes
+WINDOW_BYTES = 64 * 2**20
+
+
+class MemmapLife(NumpyLife):
+    # NumpyLife whose boards live in files. directory is created if needed, without one
+    # the boards go to a temporary directory that is deleted by close().
+    # with durable=True the next board is flushed to disk before state.json points to it,
+    # so a checkpoint also survives the machine going down, not only the process
+
+    # the stats of the current generation, once counted. with track_stats() they are added up band by band
+    # while computing the generation, otherwise when they are asked for
+    _stats: Optional[LifeStats] = None
+
+    def __init__(self, num_rows: int=0, num_cols: int=0, directory: Optional[str]=None, durable: bool=False,
+                 rule: Union[str, Rule]=CONWAY, boundary: str='dead'):
+        self.durable = durable
+        self.generation = 0
+        self.rule = rule
+        self.boundary = boundary
+
+        self._temporary = directory is None
+        self.directory = tempfile.mkdtemp(prefix='memmap_life_') if directory is None else directory
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._finalizer = None
+        if self._temporary:
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self.directory, True)
+
+        self._allocate(num_rows, num_cols)
+        self._save_state()
+
+    @classmethod
+    def resume(cls, directory: str, durable: bool=False) -> 'MemmapLife':
+        # opens the boards of an earlier run at its last complete generation
+        with open(os.path.join(directory, STATE_FILE)) as f:
+            state = json.load(f)
+
+        life = cls.__new__(cls)
+        life.durable = durable
+        life.generation = state['generation']
+        life.rule = state.get('rule', CONWAY)
+        life.boundary = state.get('boundary', 'dead')
+        life.directory = directory
+        life._temporary = False
+        life._finalizer = None
+        life._open(state['num_rows'], state['num_cols'], 'r+')
+        life._current = state['current']
+        return life
+
+    def __enter__(self) -> 'MemmapLife':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def board(self) -> np.memmap:
+        return self._boards[self._current]
+
+    @board.setter
+    def board(self, board) -> None:
+        # NumpyLife swaps boards by assignment, here the two files stay where they are
+        pass
+
+    def close(self) -> None:
+        for board in self._boards:
+            board.flush()
+        self._boards = []
+
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+
+    def flush(self) -> None:
+        self.board.flush()
+        self._save_state()
+
+    def clear_board(self) -> None:
+        for start, end in self._bands():
+            self.board[start:end] = 0
+        self._changes_valid = False
+        self._stats = None
+
+    def set_board_state(self, board: Union[List[List[int]], np.ndarray]) -> None:
+        board = np.asarray(board, dtype=np.uint8)
+
+        if board.shape != (self.num_rows, self.num_cols):
+            self._allocate(*board.shape)
+
+        for start, end in self._bands():
+            self.board[start:end] = board[start:end]
+        self._changes_valid = False
+        self._stats = None
+
+    def live_cells(self) -> List[Tuple[int, int]]:
+        return list(self._nonzero_cells(lambda start, end: live_cells_of(self.board[start:end], self.rule)))
+
+    def changed_cells(self) -> List[Tuple[int, int]]:
+        # the board of the last generation is still in the other file, so the cells that
+        # changed are found by comparing both files, and nothing is kept between generations
+        if not self._changes_valid:
+            return []
+
+        previous = self._boards[1 - self._current]
+        return list(self._nonzero_cells(
+            lambda start, end: born_or_died(previous[start:end], self.board[start:end], self.rule, None)
+        ))
+
+    @property
+    def stats(self) -> LifeStats:
+        if self._stats is None:
+            # read band by band, the changed cells by comparing with the previous board like changed_cells()
+            previous = self._boards[1 - self._current]
+            self._stats = combined_stats(self.generation, (
+                array_stats(
+                    self.generation, live_cells_of(self.board[start:end], self.rule),
+                    born_or_died(previous[start:end], self.board[start:end], self.rule, None)
+                    if self._changes_valid else None,
+                    start,
+                )
+                for start, end in self._bands()
+            ))
+        return self._stats
+
+    def compute_next_state(self) -> None:
+        board = self._boards[self._current]
+        next_board = self._boards[1 - self._current]
+
+        band_stats = [] if self._stats_history is not None else None
+        for start, end in self._bands():
+            # the band with a halo of one cell on each side, copied into the window
+            window = fill_padded(board, start, end, self.boundary, self._window[:end - start + 2])
+            counts = padded_neighbour_counts(live_cells_of(window, self.rule), self._counts[:end - start])
+            next_band = next_generation(window[1:-1, 1:-1], counts, next_board[start:end], self.rule)
+
+            if band_stats is not None:
+                # the stats of the band while it is in memory
+                changed = born_or_died(window[1:-1, 1:-1], next_band, self.rule, None)
+                band_stats.append(array_stats(self.generation + 1, live_cells_of(next_band, self.rule), changed, start))
+
+        if self.durable:
+            next_board.flush()
+
+        self._current = 1 - self._current
+        self.generation += 1
+        self._changes_valid = True
+        self._stats = combined_stats(self.generation, band_stats) if band_stats is not None else None
+        self._save_state()
+        self._record_stats()
+
+    def _make_live(self, cells: List[Tuple[int, int]], i: int, j: int) -> None:
+        super()._make_live(cells, i, j)
+        self._changes_valid = False
+        self._stats = None
+
+    def _allocate(self, num_rows: int, num_cols: int) -> None:
+        self._open(num_rows, num_cols, 'w+')
+        self._current = 0
+
+    def _open(self, num_rows: int, num_cols: int, mode: str) -> None:
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+
+        # numpy can't map empty files
+        shape = (max(num_rows, 1), max(num_cols, 1))
+        self._boards = [
+            np.memmap(os.path.join(self.directory, name), dtype=np.uint8, mode=mode, shape=shape)[:num_rows, :num_cols]
+            for name in BOARD_FILES
+        ]
+
+        # the rows of a band and its halo, reused in every band
+        self._band_rows = max(1, WINDOW_BYTES // (num_cols + 2) - 2)
+        band_rows = min(self._band_rows, max(num_rows, 1))
+        self._window = np.zeros((band_rows + 2, num_cols + 2), dtype=np.uint8)
+        self._counts = np.zeros((band_rows, num_cols), dtype=np.uint8)
+        self._changes_valid = False
+        self._stats = None
+
+    def _bands(self) -> Iterator[Tuple[int, int]]:
+        for start in range(0, self.num_rows, self._band_rows):
+            yield start, min(start + self._band_rows, self.num_rows)
+
+    def _nonzero_cells(self, band_mask) -> Iterator[Tuple[int, int]]:
+        for start, end in self._bands():
+            rows, cols = np.nonzero(band_mask(start, end))
+            yield from zip((rows + start).tolist(), cols.tolist())
+
+    def _save_state(self) -> None:
+        state = {
+            'num_rows': self.num_rows,
+            'num_cols': self.num_cols,
+            'generation': self.generation,
+            'current': self._current,
+            'rule': str(self.rule),
+            'boundary': self.boundary,
+        }
+
+        # written under another name first, so state.json is always complete
+        path = os.path.join(self.directory, STATE_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f)
+        os.replace(path + '.tmp', path)
@@ -0,0 +1,241 @@
+from typing import FrozenSet, List, Optional, Tuple, Union
+
+import numpy as np
+
+from life_game import Life
+from life_stats import LifeStats, array_stats, bounding_box
+from rules import CONWAY, Rule
+
+
+def neighbour_counts(board: np.ndarray, out: np.ndarray) -> np.ndarray:
+    # counts the live neighbours of every cell by adding up the board shifted
+    # in each of the 8 directions. cells outside of the board are dead.
+    # works on a single board (rows, cols) or a stack of boards (..., rows, cols)
+    out.fill(0)
+    out[..., 1:, :] += board[..., :-1, :]  # north
+    out[..., :-1, :] += board[..., 1:, :]  # south
+    out[..., :, 1:] += board[..., :, :-1]  # west
+    out[..., :, :-1] += board[..., :, 1:]  # east
+    out[..., 1:, 1:] += board[..., :-1, :-1]  # north-west
+    out[..., 1:, :-1] += board[..., :-1, 1:]  # north-east
+    out[..., :-1, 1:] += board[..., 1:, :-1]  # south-west
+    out[..., :-1, :-1] += board[..., 1:, 1:]  # south-east
+    return out
+
+
+def fill_padded(board: np.ndarray, start: int, end: int, boundary: str, out: np.ndarray) -> np.ndarray:
+    # copies rows start:end of the board into out, with a halo of one cell on each side filled as the boundary
+    # says (see boundary.py), so out is (end - start + 2, num_cols + 2). the halo rows above and below
+    # are rows of the board unless start:end reaches its top or bottom
+    num_rows, num_cols = board.shape
+    out[1:-1, 1:-1] = board[start:end]
+    if num_rows == 0 or num_cols == 0:
+        out.fill(0)
+        return out
+
+    for halo, i in ((0, start - 1), (-1, end)):
+        if 0 <= i < num_rows:
+            out[halo, 1:-1] = board[i]
+        elif boundary == 'dead':
+            out[halo] = 0
+        elif boundary == 'mirror':
+            out[halo, 1:-1] = board[min(max(i, 0), num_rows - 1)]
+        elif boundary == 'klein':
+            out[halo, 1:-1] = board[i % num_rows, ::-1]
+        else:
+            out[halo, 1:-1] = board[i % num_rows]
+
+    # the columns last, so the corners are the images of the halo rows
+    if boundary == 'dead':
+        out[:, 0] = 0
+        out[:, -1] = 0
+    elif boundary == 'mirror':
+        out[:, 0] = out[:, 1]
+        out[:, -1] = out[:, -2]
+    else:
+        out[:, 0] = out[:, -2]
+        out[:, -1] = out[:, 1]
+    return out
+
+
+def padded_neighbour_counts(padded: np.ndarray, out: np.ndarray) -> np.ndarray:
+    # like neighbour_counts, for a board filled by fill_padded. out is the size of the board without the halo
+    np.add(padded[:-2, :-2], padded[:-2, 1:-1], out=out)
+    out += padded[:-2, 2:]
+    out += padded[1:-1, :-2]
+    out += padded[1:-1, 2:]
+    out += padded[2:, :-2]
+    out += padded[2:, 1:-1]
+    out += padded[2:, 2:]
+    return out
+
+
+def live_cells_of(board: np.ndarray, rule: Rule) -> np.ndarray:
+    # the board to count neighbours on: only live cells count, not the dying ones of Generations rules
+    if rule.states == 2:
+        return board
+    return (board == 1).view(np.uint8)
+
+
+def next_generation(board: np.ndarray, counts: np.ndarray, out: np.ndarray, rule: Rule=CONWAY) -> np.ndarray:
+    # the next state of every cell is rule.table[state, live neighbours]
+    if rule.states > 2:
+        index = np.multiply(board, 9, dtype=np.uint16)
+        index += counts
+        np.take(rule.table.ravel(), index, out=out, mode='clip')
+        return out
+
+    # with 2 states the table is 'born' for dead cells and 'survives' for live ones, and
+    # next = born ^ (alive & (born ^ survives)). the sets of counts are tested with a few comparisons,
+    # which is faster than looking up every cell. for B3/S23: (counts == 3) ^ (alive & (counts == 2))
+    next_alive = out.view(bool)
+    _counts_in(counts, rule.birth ^ rule.survival, out=next_alive)
+    next_alive &= board.view(bool)
+    next_alive ^= _counts_in(counts, rule.birth, out=np.empty(counts.shape, dtype=bool))
+    return out
+
+
+def born_or_died(board: np.ndarray, next_board: np.ndarray, rule: Rule, out: np.ndarray) -> np.ndarray:
+    # cells that became alive or stopped being alive, not the ones that went on dying
+    if rule.states == 2:
+        return np.not_equal(board, next_board, out=out)
+    return np.not_equal(board == 1, next_board == 1, out=out)
+
+
+def _counts_in(counts: np.ndarray, values: FrozenSet[int], out: np.ndarray) -> np.ndarray:
+    # out = counts in values, as bools. every run of consecutive values is one or two comparisons
+    runs = _runs(values)
+    if not runs:
+        out.fill(False)
+    tmp = np.empty_like(out) if len(runs) > 1 else None
+    for n, (first, last) in enumerate(runs):
+        # the first run goes straight to out, the others are added to it
+        target = out if n == 0 else tmp
+        if first == last:
+            np.equal(counts, first, out=target)
+        elif first == 0:
+            np.less_equal(counts, last, out=target)
+        elif last == 8:
+            np.greater_equal(counts, first, out=target)
+        else:
+            # first <= counts <= last, counts below first wrap around to large numbers
+            np.less_equal(np.subtract(counts, first, dtype=np.uint8), last - first, out=target)
+        if n > 0:
+            out |= target
+    return out
+
+
+def _runs(values: FrozenSet[int]) -> List[Tuple[int, int]]:
+    runs: List[Tuple[int, int]] = []
+    for value in sorted(values):
+        if runs and runs[-1][1] == value - 1:
+            runs[-1] = (runs[-1][0], value)
+        else:
+            runs.append((value, value))
+    return runs
+
+
+class NumpyLife(Life):
+    # same game as Life, but the board is a contiguous (num_rows, num_cols) uint8 array
+    # and a generation is computed with whole-array operations instead of a loop per cell
+
+    # the stats of the current generation once counted, and the population while it is known.
+    # with track_stats() a generation counts its births and deaths on the changed cells it found and
+    # adds them to the population, otherwise the stats are counted on the board when they are asked for
+    _stats: Optional[LifeStats] = None
+    _population: Optional[int] = None
+
+    def __init__(self, num_rows: int=0, num_cols: int=0, rule: Union[str, Rule]=CONWAY, boundary: str='dead'):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.generation = 0
+        self.rule = rule
+        self.boundary = boundary
+
+        self.board = np.zeros((num_rows, num_cols), dtype=np.uint8)
+        self._allocate_buffers()
+
+    def clear_board(self) -> None:
+        self.board.fill(0)
+        self._changed.fill(False)
+        self._stats = None
+        self._population = 0
+
+    def set_board_state(self, board: Union[List[List[int]], np.ndarray]) -> None:
+        board = np.asarray(board, dtype=np.uint8)
+
+        if self.board.shape == board.shape:
+            self.board[...] = board
+            # the changes of the last generation were on the old board
+            self._changed.fill(False)
+        else:
+            self.board = np.ascontiguousarray(board)
+            self.num_rows, self.num_cols = self.board.shape
+            self._allocate_buffers()
+        self._stats = self._population = None
+
+    def get_board(self) -> List[List[int]]:
+        return self.board.tolist()
+
+    def live_cells(self) -> List[Tuple[int, int]]:
+        rows, cols = np.nonzero(live_cells_of(self.board, self.rule))
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    def changed_cells(self) -> List[Tuple[int, int]]:
+        rows, cols = np.nonzero(self._changed)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    @property
+    def stats(self) -> LifeStats:
+        if self._stats is None:
+            # counted on the board and on the changed cells the last generation left
+            self._stats = array_stats(self.generation, live_cells_of(self.board, self.rule), self._changed)
+            self._population = self._stats.population
+        return self._stats
+
+    def compute_next_state(self) -> None:
+        # counting on a padded copy is faster than adding the shifted board into zeroed counts,
+        # even with a dead boundary
+        padded = fill_padded(self.board, 0, self.num_rows, self.boundary, self._padded_board)
+        padded_neighbour_counts(live_cells_of(padded, self.rule), self._counts)
+        next_generation(self.board, self._counts, self._next_board, self.rule)
+        born_or_died(self.board, self._next_board, self.rule, out=self._changed)
+
+        self.board, self._next_board = self._next_board, self.board
+        self.generation += 1
+        self._stats = None
+        if self._stats_history is not None:
+            self._stats = self._step_stats()
+        else:
+            # the population isn't followed through the generations that aren't counted
+            self._population = None
+        self._record_stats()
+
+    def _step_stats(self) -> LifeStats:
+        # the stats of the generation just computed, from its changed cells: the ones that are live
+        # were born, the others died. only the bounding box is looked for on the board
+        live = live_cells_of(self.board, self.rule)
+        changed = np.count_nonzero(self._changed)
+        births = np.count_nonzero(self._changed & live)
+        if self._population is None:
+            self._population = np.count_nonzero(live)
+        else:
+            self._population += births - (changed - births)
+        return LifeStats(
+            self.generation, int(self._population), births, changed - births,
+            bounding_box(live.any(axis=1), live.any(axis=0)),
+        )
+
+    def _make_live(self, cells: List[Tuple[int, int]], i: int, j: int) -> None:
+        cells = np.asarray(cells)
+        self.board[cells[:, 0] + i, cells[:, 1] + j] = 1
+        self._stats = self._population = None
+
+    def _allocate_buffers(self) -> None:
+        # scratch buffers reused between generations: the neighbour counts,
+        # the next board, and which cells changed in the last generation
+        self._counts = np.zeros_like(self.board)
+        self._next_board = np.zeros_like(self.board)
+        self._changed = np.zeros(self.board.shape, dtype=bool)
+        # the board with its halo
+        self._padded_board = np.zeros((self.num_rows + 2, self.num_cols + 2), dtype=np.uint8)
@@ -0,0 +1,184 @@
+'''
+Steps a board on several cores. The board and the next board are kept in shared memory,
+every worker process attaches to them once and then computes a band of rows per task.
+The rows around a band (its halo) are read straight from the shared board,
+so nothing but the band limits is sent to the workers in a generation.
+Every worker also marks the cells of its band that changed in a shared mask, and while stats are tracked
+returns the stats of its band, so the parent process doesn't go over the board again.
+'''
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from life_stats import LifeStats, array_stats, combined_stats
+from numpy_life import NumpyLife, born_or_died, fill_padded, live_cells_of, next_generation, padded_neighbour_counts
+from rules import CONWAY, Rule
+
+# shared boards and the shared mask of changed cells attached in a worker process, by shared memory name
+_worker_boards: Dict[str, np.ndarray] = {}
+_worker_memory: List[shared_memory.SharedMemory] = []
+
+
+def _init_worker(names: Tuple[str, str, str], shape: Tuple[int, int]) -> None:
+    # names are the two boards and the mask of changed cells
+    for name, dtype in zip(names, (np.uint8, np.uint8, bool)):
+        # workers share the resource tracker of the parent, which unlinks the memory
+        memory = shared_memory.SharedMemory(name=name)
+        _worker_memory.append(memory)
+        _worker_boards[name] = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _step_band(source: str, target: str, changed: str, start: int, end: int, rule: Rule, boundary: str,
+               with_stats: bool) -> Optional[LifeStats]:
+    # computes the band into target and marks its changed cells, returns the stats of the band with with_stats
+    board = _worker_boards[source]
+    next_board = _worker_boards[target]
+
+    # the band with a halo of one cell on each side
+    num_cols = board.shape[1]
+    padded = fill_padded(board, start, end, boundary, np.empty((end - start + 2, num_cols + 2), dtype=np.uint8))
+    counts = padded_neighbour_counts(live_cells_of(padded, rule), np.empty((end - start, num_cols), dtype=np.uint8))
+    next_band = next_generation(board[start:end], counts, next_board[start:end], rule)
+    changed_band = born_or_died(board[start:end], next_band, rule, out=_worker_boards[changed][start:end])
+    if not with_stats:
+        return None
+    # the generation is the parent's
+    return array_stats(0, live_cells_of(next_band, rule), changed_band, start)
+
+
+class ParallelLife(NumpyLife):
+    # NumpyLife whose generations are computed by a pool of worker processes,
+    # each one stepping a band of rows. close() it (or use it in a with block) when done,
+    # to stop the workers and free the shared memory. with track_stats() the stats of a generation
+    # are added up from the stats of the bands of the workers
+
+    def __init__(self, num_rows: int=0, num_cols: int=0, workers: Optional[int]=None, rule: Union[str, Rule]=CONWAY,
+                 boundary: str='dead'):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.workers = workers or os.cpu_count() or 1
+        self.generation = 0
+        self.rule = rule
+        self.boundary = boundary
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._memory: List[shared_memory.SharedMemory] = []
+        self._finalizer = None
+        self._allocate(num_rows, num_cols)
+
+    def __enter__(self) -> 'ParallelLife':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+        if self._finalizer is not None:
+            # keep a private copy of the board, so it can still be read.
+            # stepping again moves it back into shared memory
+            self.board = self.board.copy()
+            self._changed = self._changed.copy()
+            self._boards = []
+            self._finalizer()
+            self._finalizer = None
+
+    def set_board_state(self, board: Union[List[List[int]], np.ndarray]) -> None:
+        board = np.asarray(board, dtype=np.uint8)
+
+        if self.board.shape != board.shape:
+            self.close()
+            self._allocate(*board.shape)
+
+        self.board[...] = board
+        self._changed.fill(False)
+        self._stats = self._population = None
+
+    def compute_next_state(self) -> None:
+        if self.num_rows == 0 or self.num_cols == 0:
+            # no bands to compute, nothing changes
+            self.generation += 1
+            self._stats = None
+            self._record_stats()
+            return
+
+        if self._finalizer is None:
+            board, changed = self.board, self._changed
+            self._allocate(*board.shape)
+            self.board[...] = board
+            self._changed[...] = changed
+
+        if self._pool is None:
+            # the two boards and the changed cells, in the order of _init_worker
+            names = tuple(memory.name for memory in self._memory)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(names, (self.num_rows, self.num_cols))
+            )
+
+        source = self._memory[self._current].name
+        target = self._memory[1 - self._current].name
+
+        tracked = self._stats_history is not None
+        band_rows = -(-self.num_rows // self.workers)
+        futures = [
+            self._pool.submit(
+                _step_band, source, target, self._changed_memory.name, start, min(start + band_rows, self.num_rows),
+                self.rule, self.boundary, tracked
+            )
+            for start in range(0, self.num_rows, band_rows)
+        ]
+        # re-raises errors from the workers
+        band_stats = [future.result() for future in futures]
+
+        self._current = 1 - self._current
+        self.board = self._boards[self._current]
+        self.generation += 1
+        self._stats = combined_stats(self.generation, band_stats) if tracked else None
+        self._population = self._stats.population if tracked else None
+        self._record_stats()
+
+    def _allocate(self, num_rows: int, num_cols: int) -> None:
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+
+        # the two boards and the mask of the cells changed in the last generation
+        size = max(num_rows * num_cols, 1)
+        self._memory = [shared_memory.SharedMemory(create=True, size=size) for _ in range(3)]
+        self._changed_memory = self._memory[2]
+        self._boards = [
+            np.ndarray((num_rows, num_cols), dtype=np.uint8, buffer=memory.buf)
+            for memory in self._memory[:2]
+        ]
+        for board in self._boards:
+            board.fill(0)
+
+        self._current = 0
+        self.board = self._boards[0]
+        # the workers count neighbours in their own buffers
+        self._counts = None
+        self._next_board = None
+        self._changed = np.ndarray((num_rows, num_cols), dtype=bool, buffer=self._changed_memory.buf)
+        self._changed.fill(False)
+        self._stats = self._population = None
+
+        # free the shared memory even if close() is never called
+        self._finalizer = weakref.finalize(self, _free, self._memory)
+
+
+def _free(memory: List[shared_memory.SharedMemory]) -> None:
+    for block in memory:
+        block.unlink()
+        try:
+            block.close()
+        except BufferError:
+            # arrays still point to it, the memory is unmapped when they are gone
+            pass
@@ -0,0 +1,353 @@
+'''
+reading and writing patterns in the usual Game of Life file formats:
+
+* RLE (.rle)              run length encoded, the most common format
+* plaintext (.cells)      one line per row, 'O' is a live cell and '.' a dead one
+* Macrocell (.mc)         the quadtree format of Golly, for very large patterns
+* ascii art (.txt)        like assets/head.ascii.txt, every ' ' is a live cell
+
+the readers are generators of the (i, j) of the live cells, relative to the top-left of the pattern.
+they read the file a line at a time and never build the whole board, so a pattern can be
+loaded straight into any engine with load_pattern().
+'''
+import os
+import re
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+Cells = List[Tuple[int, int]]
+
+PATTERNS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'patterns')
+
+_RLE_TOKEN = re.compile(r'(\d*)([a-zA-Z.$!])')
+# cells passed to an engine at a time while loading
+_CHUNK_SIZE = 65536
+
+
+def read_rle(path: str) -> Iterator[Tuple[int, int]]:
+    i = j = 0
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or line.startswith('x'):
+                # comments and the header (x = 3, y = 3, rule = B3/S23)
+                continue
+
+            for count, tag in _RLE_TOKEN.findall(line):
+                count = int(count) if count else 1
+                if tag == '!':
+                    return
+                elif tag == '$':
+                    i += count
+                    j = 0
+                elif tag in 'b.':
+                    j += count
+                else:
+                    # 'o', or any other letter for a live cell
+                    for _ in range(count):
+                        yield i, j
+                        j += 1
+
+
+def read_cells(path: str) -> Iterator[Tuple[int, int]]:
+    with open(path) as f:
+        i = 0
+        for line in f:
+            if line.startswith('!'):
+                continue
+            for j, c in enumerate(line.rstrip('\n')):
+                if c in 'O*':
+                    yield i, j
+            i += 1
+
+
+def read_ascii(path: str, live: str=' ') -> Iterator[Tuple[int, int]]:
+    with open(path) as f:
+        for i, line in enumerate(f):
+            for j, c in enumerate(line.rstrip('\n')):
+                if c == live:
+                    yield i, j
+
+
+def read_macrocell(path: str) -> Iterator[Tuple[int, int]]:
+    # relative to the top-left of the root node
+    nodes = _read_macrocell_nodes(path)
+    if nodes:
+        yield from _macrocell_cells(nodes, len(nodes) - 1, 0, 0)
+
+
+def read_pattern(path: str) -> Iterator[Tuple[int, int]]:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _READERS:
+        raise ValueError(f"unknown pattern format '{extension}', use one of: {', '.join(_READERS)}")
+    return _READERS[extension](path)
+
+
+def pattern_size(path: str) -> Tuple[int, int]:
+    # rows and columns of the smallest box around the pattern (starting at 0, 0)
+    num_rows = num_cols = 0
+    for i, j in read_pattern(path):
+        num_rows = max(num_rows, i + 1)
+        num_cols = max(num_cols, j + 1)
+    return num_rows, num_cols
+
+
+def read_board(path: str) -> List[List[int]]:
+    # the pattern as a list of lists board of its own size, for Life.set_board_state()
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.txt':
+        # ascii art boards keep their dead borders
+        with open(path) as f:
+            rows = [line.rstrip('\n') for line in f]
+        num_rows, num_cols = len(rows), max(len(row) for row in rows)
+    else:
+        num_rows, num_cols = pattern_size(path)
+
+    board = [
+        [0] * num_cols for _ in range(num_rows)
+    ]
+    for i, j in read_pattern(path):
+        board[i][j] = 1
+    return board
+
+
+def find_pattern(name: str) -> str:
+    # a path, or the name of a pattern in the patterns directory like 'glider_gun'
+    if os.path.exists(name):
+        return name
+
+    for extension in _READERS:
+        path = os.path.join(PATTERNS_DIR, name + extension)
+        if os.path.exists(path):
+            return path
+
+    raise FileNotFoundError(f"no pattern '{name}' in {PATTERNS_DIR}")
+
+
+def load_pattern(life, path: str, i: int=0, j: int=0) -> None:
+    # makes the cells of the pattern live with its top-left at i, j.
+    # on bounded boards the cells outside of the board are dropped
+    from hash_life import HashLife
+
+    if isinstance(life, HashLife) and path.endswith('.mc'):
+        # the quadtree is loaded as it is
+        _load_macrocell_into_hash_life(life, path, i, j)
+        return
+
+    cells = read_pattern(path)
+    if not getattr(life, 'unbounded', False):
+        cells = (
+            (ii, jj) for ii, jj in cells
+            if 0 <= i + ii < life.num_rows and 0 <= j + jj < life.num_cols
+        )
+
+    if isinstance(life, HashLife):
+        # HashLife rebuilds its tree on every _make_live, so all the cells go at once
+        life._make_live(list(cells), i, j)
+        return
+
+    while True:
+        chunk = list(islice(cells, _CHUNK_SIZE))
+        if not chunk:
+            break
+        life._make_live(chunk, i, j)
+
+
+def write_rle(path: str, cells: Iterable[Tuple[int, int]], rule: str='B3/S23') -> None:
+    cells = sorted(_shifted_to_origin(cells))
+    num_rows = max((i for i, _ in cells), default=-1) + 1
+    num_cols = max((j for _, j in cells), default=-1) + 1
+
+    tokens = []
+
+    def add(count: int, tag: str) -> None:
+        tokens.append((str(count) if count > 1 else '') + tag)
+
+    row = col = 0
+    run = 0
+    for i, j in cells:
+        if run and (i != row or j != col):
+            add(run, 'o')
+            run = 0
+        if i != row:
+            add(i - row, '$')
+            row, col = i, 0
+        if j != col:
+            add(j - col, 'b')
+            col = j
+        run += 1
+        col += 1
+    if run:
+        add(run, 'o')
+    tokens.append('!')
+
+    with open(path, 'w') as f:
+        f.write(f'x = {num_cols}, y = {num_rows}, rule = {rule}\n')
+        # lines of RLE files are at most 70 characters
+        line = ''
+        for token in tokens:
+            if len(line) + len(token) > 70:
+                f.write(line + '\n')
+                line = ''
+            line += token
+        f.write(line + '\n')
+
+
+def write_cells(path: str, cells: Iterable[Tuple[int, int]]) -> None:
+    rows: Dict[int, List[int]] = {}
+    for i, j in _shifted_to_origin(cells):
+        rows.setdefault(i, []).append(j)
+
+    with open(path, 'w') as f:
+        f.write(f'!Name: {os.path.splitext(os.path.basename(path))[0]}\n')
+        for i in range(max(rows, default=-1) + 1):
+            line = ['.'] * (max(rows.get(i, [-1])) + 1)
+            for j in rows.get(i, []):
+                line[j] = 'O'
+            f.write(''.join(line) + '\n')
+
+
+def _shifted_to_origin(cells: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    # the cells moved so the top left corner of their bounding box is (0, 0), the cells of
+    # unbounded engines can be anywhere and the formats have no negative coordinates
+    cells = list(cells)
+    if not cells:
+        return cells
+    top = min(i for i, _ in cells)
+    left = min(j for _, j in cells)
+    return [(i - top, j - left) for i, j in cells]
+
+
+def write_macrocell(path: str, cells: Iterable[Tuple[int, int]], rule: str='B3/S23') -> None:
+    from hash_life import HashLife
+
+    life = HashLife()
+    life._make_live(list(cells), 0, 0)
+    write_hash_life(path, life, rule)
+
+
+def write_hash_life(path: str, life, rule: str='B3/S23') -> None:
+    # writes the quadtree of a HashLife as it is, every distinct node once
+    lines = []
+    ids = {}
+
+    def node_id(node) -> int:
+        if node.population == 0:
+            return 0
+        if node in ids:
+            return ids[node]
+
+        if node.level == 3:
+            # 8x8 leaves are written as rows of '.' and '*'
+            rows = [['.'] * 8 for _ in range(8)]
+            for i, j in life._live_cells(node, 0, 0):
+                rows[i][j] = '*'
+            text = '$'.join(''.join(row).rstrip('.') for row in rows).rstrip('$') + '$'
+        else:
+            children = [node_id(child) for child in (node.nw, node.ne, node.sw, node.se)]
+            text = f"{node.level} {' '.join(map(str, children))}"
+
+        lines.append(text)
+        ids[node] = len(lines)
+        return ids[node]
+
+    root = life._root
+    while root.level < 3:
+        root = life._expand(root)
+    node_id(root)
+
+    with open(path, 'w') as f:
+        f.write('[M2] (life)\n')
+        f.write(f'#R {rule}\n')
+        for line in lines:
+            f.write(line + '\n')
+
+
+def save_pattern(life, path: str) -> None:
+    # writes the live cells of any engine, the format is picked by the extension
+    from hash_life import HashLife
+
+    extension = os.path.splitext(path)[1].lower()
+    rule = getattr(life, 'rule', 'B3/S23')
+    if extension == '.mc' and isinstance(life, HashLife):
+        write_hash_life(path, life, str(rule))
+    elif extension == '.mc':
+        write_macrocell(path, life.live_cells(), str(rule))
+    elif extension == '.rle':
+        write_rle(path, life.live_cells(), str(rule))
+    elif extension == '.cells':
+        write_cells(path, life.live_cells())
+    else:
+        raise ValueError(f"can't write '{extension}' patterns, use .rle, .cells or .mc")
+
+
+_READERS = {
+    '.rle': read_rle,
+    '.cells': read_cells,
+    '.mc': read_macrocell,
+    '.txt': read_ascii,
+}
+
+
+# Macrocell internals
+
+def _read_macrocell_nodes(path: str) -> list:
+    # every node is ('leaf', cells of the 8x8 square) or (level, nw, ne, sw, se)
+    # with the children as indexes into the list, 0 for an empty node
+    nodes: list = [None]
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('[') or line.startswith('#'):
+                continue
+
+            if line[0] in '.*$':
+                cells = []
+                for i, row in enumerate(line.split('$')):
+                    cells.extend((i, j) for j, c in enumerate(row) if c == '*')
+                nodes.append(('leaf', cells))
+            else:
+                level, nw, ne, sw, se = map(int, line.split())
+                nodes.append((level, nw, ne, sw, se))
+    return nodes
+
+
+def _macrocell_cells(nodes: list, index: int, top: int, left: int) -> Iterator[Tuple[int, int]]:
+    node = nodes[index]
+    if node[0] == 'leaf':
+        for i, j in node[1]:
+            yield top + i, left + j
+        return
+
+    level, nw, ne, sw, se = node
+    half = 1 << (level - 1)
+    for child, (di, dj) in zip((nw, ne, sw, se), ((0, 0), (0, half), (half, 0), (half, half))):
+        if child:
+            yield from _macrocell_cells(nodes, child, top + di, left + dj)
+
+
+def _load_macrocell_into_hash_life(life, path: str, i: int, j: int) -> None:
+    nodes = _read_macrocell_nodes(path)
+    if len(nodes) == 1:
+        return
+
+    built = [None] * len(nodes)
+    for index in range(1, len(nodes)):
+        node = nodes[index]
+        if node[0] == 'leaf':
+            built[index] = life._build(node[1], 3, 0, 0)
+        else:
+            level = node[0]
+            built[index] = life._join(*(
+                built[child] if child else life._empty_node(level - 1)
+                for child in node[1:]
+            ))
+
+    # place the pattern over what is on the board already
+    root = built[-1]
+    cells = life.live_cells()
+    if cells:
+        pattern = [(i + ii, j + jj) for ii, jj in life._live_cells(root, 0, 0)]
+        life._set_cells(cells + pattern)
+    else:
+        life._set_root(root, i, j)
@@ -0,0 +1,140 @@
+'''
+a library of patterns compiled to arrays, and stamping many of them on a board at once.
+
+every pattern of the patterns directory (and every pattern added with register_pattern) is read once
+into a mask, a (rows, cols) uint8 array, and the live cells of each of its 8 orientations are computed
+once as an (n, 2) array. stamp() then adds the cells of all the placements together with numpy and
+writes them to the engine in one call, so placing thousands of gliders costs about as much as one.
+
+an orientation is one of the 8 symmetries of the square, by number or by name:
+
+    0 identity    1 rot90    2 rot180    3 rot270          rotations clockwise
+    4 flip        5 flip_rot90    6 flip_rot180    7 flip_rot270    mirrored left to right, then rotated
+
+the top-left of the box around the oriented pattern is at the position it is stamped at.
+'''
+import os
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from pattern_io import PATTERNS_DIR, find_pattern, read_pattern
+
+ORIENTATIONS = (
+    'identity', 'rot90', 'rot180', 'rot270',
+    'flip', 'flip_rot90', 'flip_rot180', 'flip_rot270',
+)
+
+Orientation = Union[int, str]
+
+# name -> mask
+_masks: Dict[str, np.ndarray] = {}
+# (name, orientation number) -> (n, 2) int64 cells
+_oriented: Dict[Tuple[str, int], np.ndarray] = {}
+
+
+def register_pattern(name: str, cells: Iterable[Tuple[int, int]]) -> np.ndarray:
+    # adds a pattern to the library, or replaces one, and returns its mask
+    cells = np.array(list(cells), dtype=np.int64).reshape(-1, 2)
+    if len(cells):
+        cells -= cells.min(axis=0)
+
+    mask = np.zeros(tuple(cells.max(axis=0, initial=-1) + 1), dtype=np.uint8)
+    mask[cells[:, 0], cells[:, 1]] = 1
+
+    _masks[name] = mask
+    for orientation in range(len(ORIENTATIONS)):
+        _oriented.pop((name, orientation), None)
+    return mask
+
+
+def pattern_mask(name: str) -> np.ndarray:
+    # the mask of a registered pattern, or of a pattern file (by path or by name in the patterns directory)
+    if name not in _masks:
+        register_pattern(name, read_pattern(find_pattern(name)))
+    return _masks[name]
+
+
+def pattern_names() -> List[str]:
+    # the registered patterns and the ones in the patterns directory
+    names = set(_masks)
+    names.update(os.path.splitext(file_name)[0] for file_name in os.listdir(PATTERNS_DIR))
+    return sorted(names)
+
+
+def orientation_number(orientation: Orientation) -> int:
+    if isinstance(orientation, str):
+        if orientation not in ORIENTATIONS:
+            raise ValueError(f"unknown orientation '{orientation}', use one of: {', '.join(ORIENTATIONS)}")
+        return ORIENTATIONS.index(orientation)
+    if not 0 <= orientation < len(ORIENTATIONS):
+        raise ValueError(f'orientation {orientation} is not between 0 and {len(ORIENTATIONS) - 1}')
+    return int(orientation)
+
+
+def oriented_cells(name: str, orientation: Orientation=0) -> np.ndarray:
+    # the (i, j) of the live cells of the pattern in the orientation, relative to its top-left
+    key = (name, orientation_number(orientation))
+    if key not in _oriented:
+        mask = pattern_mask(name)
+        if key[1] >= 4:
+            mask = mask[:, ::-1]
+        # np.rot90 turns counterclockwise
+        mask = np.rot90(mask, -(key[1] % 4))
+        _oriented[key] = np.argwhere(mask).astype(np.int64)
+    return _oriented[key]
+
+
+def stamp_cells(patterns: Union[str, Sequence[str]], positions,
+                orientations: Union[Orientation, Sequence[Orientation]]=0) -> np.ndarray:
+    # the (i, j) of the live cells of every placement: patterns[k] in orientations[k] with its top-left at
+    # positions[k]. a single pattern or orientation is used for all the positions
+    positions = np.asarray(positions, dtype=np.int64).reshape(-1, 2)
+    count = len(positions)
+
+    single = isinstance(patterns, str) and isinstance(orientations, (int, str, np.integer))
+    if single:
+        # the same shape everywhere, no loop over the positions
+        groups = {(patterns, orientation_number(orientations)): slice(None)}
+    else:
+        names = [patterns] * count if isinstance(patterns, str) else list(patterns)
+        if isinstance(orientations, (int, str, np.integer)):
+            numbers = [orientation_number(orientations)] * count
+        else:
+            numbers = [orientation_number(orientation) for orientation in orientations]
+        if len(names) != count or len(numbers) != count:
+            raise ValueError(f'{count} positions, but {len(names)} patterns and {len(numbers)} orientations')
+
+        groups = {}
+        for k, key in enumerate(zip(names, numbers)):
+            groups.setdefault(key, []).append(k)
+
+    blocks = []
+    for (name, orientation), indexes in groups.items():
+        cells = oriented_cells(name, orientation)
+        # every cell of the shape at every position of the group
+        blocks.append((positions[indexes][:, np.newaxis, :] + cells[np.newaxis, :, :]).reshape(-1, 2))
+    if not blocks:
+        return np.zeros((0, 2), dtype=np.int64)
+    return np.concatenate(blocks)
+
+
+def stamp(life, patterns: Union[str, Sequence[str]], positions,
+          orientations: Union[Orientation, Sequence[Orientation]]=0) -> None:
+    # makes the cells of every placement live (see stamp_cells) in one write to the engine.
+    # on bounded boards the cells outside of the board are dropped
+    from bit_life import BitLife
+    from numpy_life import NumpyLife
+
+    cells = stamp_cells(patterns, positions, orientations)
+    if not getattr(life, 'unbounded', False):
+        inside = (
+            (cells[:, 0] >= 0) & (cells[:, 0] < life.num_rows) &
+            (cells[:, 1] >= 0) & (cells[:, 1] < life.num_cols)
+        )
+        cells = cells[inside]
+    if not len(cells):
+        return
+
+    # the array engines index their boards with the array, the others take (i, j) pairs
+    life._make_live(cells if isinstance(life, (NumpyLife, BitLife)) else cells.tolist(), 0, 0)
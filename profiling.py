@@ -0,0 +1,172 @@
+'''
+opt-in instrumentation of the scenes of app.py, to see where the time of a slow render goes.
+
+a Profiler times every scene method decorated with @profiled (only the outermost one, when scenes
+call each other) and the phases inside of it:
+
+    generation    compute_next_state
+    draw          updating the squares or the image of the grid, with the number of cells touched
+    text          creating Text mobjects
+    play, wait    manim's play() and wait()
+
+with cprofile_dir every scene is also run under cProfile and its stats are written to <scene>.prof there
+(read them with python -m pstats or snakeviz), and with trace_allocations tracemalloc measures the memory
+allocated in every scene. report() prints a summary per scene.
+
+when the scene has no profiler, a phase is a shared do-nothing context manager and @profiled
+is one attribute lookup, so the instrumentation can stay in the code.
+'''
+import cProfile
+import functools
+import os
+import time
+import tracemalloc
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+_NO_PHASE = nullcontext()
+
+
+class SceneStats:
+    # what was measured in all the calls of a scene method
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        # phase name -> [number of times, seconds, cells]
+        self.phases: Dict[str, List[float]] = {}
+        # largest memory allocated during a call, above what was allocated before it, and the memory
+        # still allocated after the calls
+        self.peak_bytes = 0
+        self.net_bytes = 0
+
+
+class Profiler:
+
+    def __init__(self, cprofile_dir: Optional[str]=None, trace_allocations: bool=False):
+        self.cprofile_dir = cprofile_dir
+        self.trace_allocations = trace_allocations
+        self.scenes: Dict[str, SceneStats] = {}
+
+        self._scene: Optional[SceneStats] = None
+        self._profiles: Dict[str, cProfile.Profile] = {}
+
+    def scene(self, name: str) -> '_Scene':
+        return _Scene(self, name)
+
+    def phase(self, name: str, cells: int=0) -> '_Phase':
+        # times a phase of the current scene, cells is the number of cells the phase touched
+        return _Phase(self, name, cells)
+
+    def report(self) -> str:
+        # the summary of every scene, printed and returned
+        lines = [f"{'scene':<20} {'calls':>5} {'seconds':>8} {'gens':>6} {'ms/gen':>7} "
+                 f"{'draw ms':>8} {'cells':>8} {'text s':>7} {'play s':>7} {'wait s':>7} {'peak MB':>8} {'net MB':>7}"]
+
+        for name, stats in self.scenes.items():
+            generations, generation_seconds, _ = stats.phases.get('generation', (0, 0.0, 0))
+            draws, draw_seconds, cells = stats.phases.get('draw', (0, 0.0, 0))
+            ms_per_generation = generation_seconds / generations * 1000 if generations else 0.0
+            ms_per_draw = draw_seconds / draws * 1000 if draws else 0.0
+            lines.append(
+                f"{name:<20} {stats.calls:>5} {stats.seconds:>8.2f} {generations:>6} {ms_per_generation:>7.2f} "
+                f"{ms_per_draw:>8.2f} {int(cells):>8} "
+                f"{stats.phases.get('text', (0, 0.0))[1]:>7.2f} {stats.phases.get('play', (0, 0.0))[1]:>7.2f} "
+                f"{stats.phases.get('wait', (0, 0.0))[1]:>7.2f} "
+                f"{stats.peak_bytes / 2**20:>8.1f} {stats.net_bytes / 2**20:>7.1f}"
+            )
+
+        if self.cprofile_dir is not None:
+            os.makedirs(self.cprofile_dir, exist_ok=True)
+            for name, profile in self._profiles.items():
+                profile.dump_stats(os.path.join(self.cprofile_dir, f'{name}.prof'))
+            lines.append(f'cProfile stats of every scene in {self.cprofile_dir}')
+
+        text = '\n'.join(lines)
+        print(text)
+        return text
+
+
+class _Scene:
+
+    def __init__(self, profiler: Profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.outermost = False
+
+    def __enter__(self) -> None:
+        profiler = self.profiler
+        if profiler._scene is not None:
+            # the time of scenes called by a scene is part of the outer one
+            return
+
+        self.outermost = True
+        self.stats = profiler.scenes.setdefault(self.name, SceneStats())
+        profiler._scene = self.stats
+
+        if profiler.trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self.start_bytes = tracemalloc.get_traced_memory()[0]
+        if profiler.cprofile_dir is not None:
+            self.profile = profiler._profiles.setdefault(self.name, cProfile.Profile())
+            self.profile.enable()
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        if not self.outermost:
+            return
+
+        stats = self.stats
+        stats.calls += 1
+        stats.seconds += time.perf_counter() - self.start
+        if self.profiler.cprofile_dir is not None:
+            self.profile.disable()
+        if self.profiler.trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            stats.peak_bytes = max(stats.peak_bytes, peak - self.start_bytes)
+            stats.net_bytes += current - self.start_bytes
+        self.profiler._scene = None
+
+
+class _Phase:
+
+    def __init__(self, profiler: Profiler, name: str, cells: int):
+        self.profiler = profiler
+        self.name = name
+        self.cells = cells
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        seconds = time.perf_counter() - self.start
+        scene = self.profiler._scene
+        if scene is None:
+            # outside of the scene methods
+            scene = self.profiler.scenes.setdefault('(other)', SceneStats())
+
+        phase = scene.phases.setdefault(self.name, [0, 0.0, 0])
+        phase[0] += 1
+        phase[1] += seconds
+        phase[2] += self.cells
+
+
+def phase(profiler: Optional[Profiler], name: str, cells: int=0):
+    # profiler.phase(name, cells), or a context manager that does nothing without a profiler
+    if profiler is None:
+        return _NO_PHASE
+    return profiler.phase(name, cells)
+
+
+def profiled(method):
+    # times the calls of a method of a scene with a profiler attribute
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = self.profiler
+        if profiler is None:
+            return method(self, *args, **kwargs)
+        with profiler.scene(method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,88 @@
+'''
+draws the whole board as one image instead of one Square per cell.
+building it and updating it costs about the same for any size of board,
+which makes grids of hundreds of thousands of cells usable.
+
+the camera of manimgl makes a texture of every image path it draws and keeps it until the end of the render.
+given the camera of the scene, the grid loads one image and then writes every frame into its texture,
+otherwise every frame is a new image.
+'''
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+from PIL import Image
+from manimlib import Group, ImageMobject
+
+# longest side of the image, each cell is drawn as a square of pixels
+MAX_IMAGE_SIZE = 2048
+# old frames are deleted once this many newer ones are written, the renderer
+# may still have to load the last ones from disk
+KEEP_FRAMES = 3
+
+
+def hex_to_rgb(color: str) -> np.ndarray:
+    color = color.lstrip('#')
+    return np.array([int(color[k:k + 2], 16) for k in (0, 2, 4)], dtype=np.uint8)
+
+
+class RasterGrid(Group):
+
+    def __init__(self, num_rows: int, num_cols: int, height: float,
+                 live_color: str, dead_color: str, camera=None, **kwargs):
+        super().__init__(**kwargs)
+
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.image_height = height
+        self.cell_pixels = max(1, MAX_IMAGE_SIZE // max(num_rows, num_cols))
+
+        # color of dead and live cells, indexed by the value of the cell
+        self.palette = np.stack([hex_to_rgb(dead_color), hex_to_rgb(live_color)])
+        # the same opaque, for the textures of the camera, which are RGBA
+        self.texture_palette = np.concatenate([self.palette, np.full((2, 1), 255, dtype=np.uint8)], axis=1)
+        self.camera = camera
+
+        # manim loads an image by its path, so without a loaded texture every frame is written to a new file
+        self.frames_dir = tempfile.mkdtemp(prefix='life_raster_')
+        weakref.finalize(self, shutil.rmtree, self.frames_dir, ignore_errors=True)
+        self.frame_count = 0
+
+        self.image = None
+        self.show_board(np.zeros((num_rows, num_cols), dtype=np.uint8))
+
+    def show_board(self, board) -> None:
+        # replace the displayed image with the given board (Life.board or any 2D 0/1 array)
+        board = np.asarray(board, dtype=np.uint8)
+        texture = self._texture()
+        pixels = (self.palette if texture is None else self.texture_palette)[board]
+        pixels = pixels.repeat(self.cell_pixels, axis=0).repeat(self.cell_pixels, axis=1)
+
+        if texture is not None:
+            # the image is already on the GPU, its pixels are replaced
+            texture.write(pixels.tobytes())
+            return
+
+        Image.fromarray(pixels).save(self._frame_path(self.frame_count))
+        if self.frame_count >= KEEP_FRAMES:
+            os.remove(self._frame_path(self.frame_count - KEEP_FRAMES))
+
+        image = ImageMobject(self._frame_path(self.frame_count), height=self.image_height)
+        self.frame_count += 1
+        if self.image is not None:
+            image.move_to(self.image)
+            self.remove(self.image)
+        self.image = image
+        self.add(image)
+
+    def _texture(self):
+        # the texture the camera made from the displayed image, None if it hasn't drawn it yet
+        if self.camera is None or self.image is None:
+            return None
+        loaded = self.camera.path_to_texture.get(self._frame_path(self.frame_count - 1))
+        return None if loaded is None else loaded[1]
+
+    def _frame_path(self, frame: int) -> str:
+        return os.path.join(self.frames_dir, f'frame_{frame}.bmp')
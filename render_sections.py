@@ -0,0 +1,111 @@
+'''
+renders the sections of AppLife (see SECTIONS in app.py) at the same time, each one by its own manimgl
+process with its own Life and grid, and joins the partial movies with ffmpeg without re-encoding them.
+every section starts from a cleared screen, so the sections can be rendered apart. the joined movie is not
+frame for frame a render of the whole scene: clear_screen() waits 0.1 seconds at the start of every section,
+which shows the last frame of the previous section in a whole render but an empty grid in a section rendered
+on its own. the wall-clock time is about that of the longest section when there is a core for every section.
+
+    python render_sections.py
+    python render_sections.py --workers 4 --quality low
+    python render_sections.py --sections r_pentomino,glider_gun --output footage/patterns.mp4
+
+the partial movies stay in the videos directory of manimgl's output directory, a section can be rendered again on its own with
+APP_LIFE_SECTIONS=<section> manimgl app.py AppLife -w
+'''
+import argparse
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence
+
+import yaml
+
+from app import SECTIONS, SECTIONS_VARIABLE
+from headless_export import CONFIG_PATH
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# manimgl flags of the camera_qualities in custom_config.yml
+QUALITY_FLAGS = {
+    'low': '-l',
+    'medium': '-m',
+    'high': '--hd',
+    'ultra_high': '--uhd',
+}
+
+
+def output_directory(config_path: str=CONFIG_PATH) -> str:
+    # the output directory of manimgl from custom_config.yml, it writes its movies in the videos directory in it
+    with open(config_path) as f:
+        directory = yaml.safe_load(f)['directories']['output']
+    return os.path.join(HERE, directory)
+
+
+def render_section(name: str, file_name: str, quality: Optional[str]=None) -> str:
+    # renders one section in a manimgl process, returns the path of its movie
+    command = ['manimgl', 'app.py', 'AppLife', '-w', '--file_name', file_name]
+    if quality is not None:
+        command.append(QUALITY_FLAGS[quality])
+    environment = dict(os.environ, **{SECTIONS_VARIABLE: name})
+
+    result = subprocess.run(command, cwd=HERE, env=environment, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"section '{name}': manimgl exited with code {result.returncode}\n{result.stderr[-2000:]}")
+
+    path = os.path.join(output_directory(), 'videos', file_name + '.mp4')
+    if not os.path.exists(path):
+        raise RuntimeError(f"section '{name}': manimgl didn't write {path}")
+    return path
+
+
+def concatenate(paths: Sequence[str], output: str) -> None:
+    # joins movies with the same codec and settings one after the other, copying their streams
+    list_path = output + '.txt'
+    with open(list_path, 'w') as f:
+        for path in paths:
+            # single quotes are escaped for the concat demuxer
+            path = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{path}'\n")
+
+    command = ['ffmpeg', '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0', '-i', list_path, '-c', 'copy', output]
+    try:
+        subprocess.run(command, check=True)
+    finally:
+        os.remove(list_path)
+
+
+def render(output: str, sections: Sequence[str]=SECTIONS, workers: Optional[int]=None,
+           quality: Optional[str]=None) -> List[str]:
+    # renders the sections with at most workers manimgl processes at once (one per core by default),
+    # writes them joined to output and returns the paths of the partial movies
+    for name in sections:
+        if name not in SECTIONS:
+            raise ValueError(f"unknown section '{name}', use some of: {', '.join(SECTIONS)}")
+
+    # the partial movies are named after the output, numbered in order
+    base_name = os.path.splitext(os.path.basename(output))[0]
+    file_names = [f'{base_name}_{k:02d}_{name}' for k, name in enumerate(sections)]
+
+    # the threads only wait for their manimgl process
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        paths = list(pool.map(render_section, sections, file_names, [quality] * len(sections)))
+
+    concatenate(paths, output)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='render the sections of AppLife in parallel and join them')
+    parser.add_argument('--output', default=os.path.join(output_directory(), 'AppLife.mp4'))
+    parser.add_argument('--sections', default=','.join(SECTIONS),
+                        help=f"comma separated sections, in order, from: {', '.join(SECTIONS)}")
+    parser.add_argument('--workers', type=int, help='manimgl processes at once, one per core by default')
+    parser.add_argument('--quality', choices=sorted(QUALITY_FLAGS), help='one of camera_qualities in custom_config.yml')
+    args = parser.parse_args()
+
+    render(args.output, args.sections.split(','), workers=args.workers, quality=args.quality)
+
+
+if __name__ == '__main__':
+    main()
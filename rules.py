@@ -0,0 +1,107 @@
+'''
+rules of outer-totalistic cellular automata, like B3/S23 for the Game of Life.
+
+a rule string says with how many live neighbours a dead cell is born (B) and a live cell survives (S):
+
+    B3/S23      Conway's Game of Life
+    B36/S23     HighLife
+    23/3        the same as B3/S23, in the older S/B notation
+
+Generations rules add a number of states, C: a live cell that doesn't survive doesn't die at once
+but goes through the dying states 2, 3, ..., C - 1 before it is dead (0) again. only live cells (1)
+count as neighbours and only dead cells can be born:
+
+    B2/S/C3     Brian's Brain
+    /2/3        the same, in the S/B/C notation of Golly
+
+every rule is compiled once into a lookup table, table[state, live neighbours] -> next state,
+which the engines index instead of testing the counts cell by cell.
+'''
+import re
+from typing import FrozenSet, Union
+
+import numpy as np
+
+# some well known rules by name
+NAMED_RULES = {
+    'life': 'B3/S23',
+    'highlife': 'B36/S23',
+    'seeds': 'B2/S',
+    'day_and_night': 'B3678/S34678',
+    'life_without_death': 'B3/S012345678',
+    'brians_brain': 'B2/S/C3',
+    'star_wars': 'B2/S345/C4',
+}
+
+_BS = re.compile(r'^B([0-8]*)/S([0-8]*)(?:/C?(\d+))?$', re.IGNORECASE)
+_SB = re.compile(r'^S([0-8]*)/B([0-8]*)(?:/C?(\d+))?$', re.IGNORECASE)
+_NUMBERS = re.compile(r'^([0-8]*)/([0-8]*)(?:/(\d+))?$')
+
+
+class Rule:
+
+    def __init__(self, birth: FrozenSet[int], survival: FrozenSet[int], states: int=2):
+        if states < 2 or states > 256:
+            raise ValueError('a rule has between 2 and 256 states')
+
+        self.birth = frozenset(birth)
+        self.survival = frozenset(survival)
+        self.states = states
+
+        # table[state, live neighbours] -> next state
+        table = np.zeros((states, 9), dtype=np.uint8)
+        for count in range(9):
+            table[0, count] = 1 if count in self.birth else 0
+            if count in self.survival:
+                table[1, count] = 1
+            else:
+                table[1, count] = 2 if states > 2 else 0
+        for state in range(2, states):
+            table[state, :] = (state + 1) % states
+        self.table = table
+        # the same as lists, for the pure Python engines
+        self.lookup = table.tolist()
+
+    @classmethod
+    def parse(cls, rule: str) -> 'Rule':
+        text = NAMED_RULES.get(rule.lower(), rule).replace(' ', '')
+
+        match = _BS.match(text)
+        if match:
+            birth, survival, states = match.groups()
+        else:
+            match = _SB.match(text) or _NUMBERS.match(text)
+            if not match:
+                raise ValueError(f"can't read the rule '{rule}', write it like B3/S23 or B2/S/C3")
+            survival, birth, states = match.groups()
+
+        return cls(
+            frozenset(int(c) for c in birth),
+            frozenset(int(c) for c in survival),
+            int(states) if states else 2,
+        )
+
+    def __str__(self) -> str:
+        text = f"B{''.join(map(str, sorted(self.birth)))}/S{''.join(map(str, sorted(self.survival)))}"
+        if self.states > 2:
+            text += f'/C{self.states}'
+        return text
+
+    def __repr__(self) -> str:
+        return f"Rule('{self}')"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Rule) and str(self) == str(other)
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+
+CONWAY = Rule.parse('B3/S23')
+
+
+def parse_rule(rule: Union[str, Rule]) -> Rule:
+    # a Rule from a rule string or a name from NAMED_RULES, Rules are returned as they are
+    if isinstance(rule, Rule):
+        return rule
+    return Rule.parse(rule)
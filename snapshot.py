@@ -0,0 +1,283 @@
+'''
+binary snapshots of a simulation: the board, its size, the generation, the rule, the boundary and the engine.
+
+a snapshot is a fixed header, the engine name and the rule, then the board in one of 3 encodings:
+
+* cells    the (i, j) of every live cell as int64 pairs. restoring costs time proportional to the population
+* bits     every row packed in little endian 64 bit words, like BitLife.words
+* bytes    one uint8 per cell, like NumpyLife.board
+
+the board starts at an offset that is a multiple of 8, so BitLife (bits) and NumpyLife (bytes) map it
+straight from the file, copy on write, instead of reading it.
+without an encoding, save_snapshot() picks the smaller of cells and bits.
+
+Checkpointer saves a snapshot every n generations and / or every t seconds of a long run.
+'''
+import os
+import struct
+import time
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from bit_life import BitLife, pack_rows, unpack_rows
+from boundary import BOUNDARIES
+from life_game import Life
+from numpy_life import NumpyLife
+
+MAGIC = b'LIFESNAP'
+VERSION = 1
+ENCODINGS = ('cells', 'bits', 'bytes')
+
+# magic, version, encoding, flags, num_rows, num_cols, generation, cell count, engine length, rule length,
+# boundary. snapshots from before boundaries have 0 there, a dead boundary
+_HEADER = struct.Struct('<8sHBBqqqqHHB3x')
+_UNBOUNDED = 1
+
+
+class SnapshotHeader(NamedTuple):
+    encoding: str
+    unbounded: bool
+    num_rows: int
+    num_cols: int
+    generation: int
+    num_cells: int
+    engine: str
+    rule: str
+    boundary: str
+    offset: int
+
+
+def save_snapshot(life: Life, path: str, encoding: Optional[str]=None) -> None:
+    unbounded = getattr(life, 'unbounded', False)
+    if encoding is None:
+        encoding = _pick_encoding(life)
+    if encoding not in ENCODINGS:
+        raise ValueError(f"unknown encoding '{encoding}', use one of: {', '.join(ENCODINGS)}")
+    if unbounded and encoding != 'cells':
+        # the cells outside of the window would be lost
+        raise ValueError('unbounded boards can only be saved as cells')
+    if life.rule.states > 2 and encoding != 'bytes':
+        # the dying states of Generations rules need more than a bit
+        raise ValueError('boards of Generations rules can only be saved as bytes')
+
+    if encoding == 'cells':
+        payload = np.array(life.live_cells(), dtype='<i8').reshape(-1, 2)
+    elif encoding == 'bits':
+        words = life.words if isinstance(life, BitLife) else pack_rows(_dense_board(life))
+        payload = words.astype('<u8', copy=False)
+    else:
+        payload = _dense_board(life)
+
+    engine = _engine_name(life).encode()
+    rule = str(life.rule).encode()
+    header = _HEADER.pack(
+        MAGIC, VERSION, ENCODINGS.index(encoding), _UNBOUNDED if unbounded else 0,
+        life.num_rows, life.num_cols, getattr(life, 'generation', 0),
+        len(payload) if encoding == 'cells' else 0,
+        len(engine), len(rule), BOUNDARIES.index(life.boundary),
+    )
+    names = engine + rule
+    padding = b'\0' * (-(len(header) + len(names)) % 8)
+
+    # written under another name first, so a crash never leaves a broken snapshot behind
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header + names + padding)
+        payload.tofile(f)
+    os.replace(tmp_path, path)
+
+
+def read_header(path: str) -> SnapshotHeader:
+    with open(path, 'rb') as f:
+        fields = _HEADER.unpack(f.read(_HEADER.size))
+        (magic, version, encoding, flags, num_rows, num_cols, generation, num_cells,
+         engine_length, rule_length, boundary) = fields
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a snapshot')
+        if version != VERSION:
+            raise ValueError(f'snapshot version {version} is not supported')
+
+        engine = f.read(engine_length).decode()
+        rule = f.read(rule_length).decode()
+
+    offset = _HEADER.size + engine_length + rule_length
+    offset += -offset % 8
+    return SnapshotHeader(
+        ENCODINGS[encoding], bool(flags & _UNBOUNDED), num_rows, num_cols,
+        generation, num_cells, engine, rule, BOUNDARIES[boundary], offset
+    )
+
+
+def load_snapshot(path: str, life: Optional[Life]=None) -> Life:
+    # restores the snapshot into life, or into a new engine of the type that was saved
+    header = read_header(path)
+
+    if life is None:
+        from engines import ENGINES, create_life
+
+        if header.engine not in ENGINES:
+            raise ValueError(f"snapshot of unknown engine '{header.engine}'")
+        kwargs = {'unbounded': True} if header.engine == 'sparse' and header.unbounded else {}
+        life = create_life(header.num_rows, header.num_cols, engine=header.engine, **kwargs)
+
+    # raises a ValueError if the engine can't run the rule or have the boundary
+    life.rule = header.rule
+    life.boundary = header.boundary
+
+    if header.encoding == 'cells':
+        _load_cells(life, path, header)
+    elif header.encoding == 'bits':
+        _load_bits(life, path, header)
+    else:
+        _load_bytes(life, path, header)
+
+    life.generation = header.generation
+    return life
+
+
+class Checkpointer:
+    # saves a snapshot of life to path every_generations generations and / or every_seconds seconds.
+    # call update() after every generation
+
+    def __init__(self, path: str, every_generations: Optional[int]=None, every_seconds: Optional[float]=None,
+                 encoding: Optional[str]=None):
+        if every_generations is None and every_seconds is None:
+            raise ValueError('set every_generations, every_seconds or both')
+
+        self.path = path
+        self.every_generations = every_generations
+        self.every_seconds = every_seconds
+        self.encoding = encoding
+
+        self._last_generation: Optional[int] = None
+        self._last_time = time.monotonic()
+
+    def restore(self, life: Life) -> bool:
+        # loads the last checkpoint into life, if there is one
+        if not os.path.exists(self.path):
+            return False
+
+        load_snapshot(self.path, life)
+        self._last_generation = life.generation
+        return True
+
+    def update(self, life: Life) -> bool:
+        # saves a checkpoint if one is due, returns whether it did
+        if self._last_generation is None:
+            self._last_generation = life.generation
+
+        due = (
+            self.every_generations is not None
+            and life.generation - self._last_generation >= self.every_generations
+        ) or (
+            self.every_seconds is not None
+            and time.monotonic() - self._last_time >= self.every_seconds
+        )
+        if due:
+            self.save(life)
+        return due
+
+    def save(self, life: Life) -> None:
+        save_snapshot(life, self.path, self.encoding)
+        self._last_generation = life.generation
+        self._last_time = time.monotonic()
+
+
+def _engine_name(life: Life) -> str:
+    from engines import ENGINES
+
+    for name, engine in ENGINES.items():
+        if type(life) is engine:
+            return name
+    return type(life).__name__
+
+
+def _pick_encoding(life: Life) -> str:
+    if getattr(life, 'unbounded', False):
+        return 'cells'
+    if life.rule.states > 2:
+        return 'bytes'
+
+    # 16 bytes per live cell against 1 bit per cell
+    population = getattr(life, 'population', None)
+    if population is None:
+        if isinstance(life, BitLife):
+            population = int(np.unpackbits(life.words.view(np.uint8)).sum())
+        elif isinstance(life, NumpyLife):
+            population = int(np.count_nonzero(life.board))
+        else:
+            population = len(life.live_cells())
+
+    bits_size = life.num_rows * ((life.num_cols + 63) // 64) * 8
+    return 'cells' if population * 16 < bits_size else 'bits'
+
+
+def _dense_board(life: Life) -> np.ndarray:
+    return np.ascontiguousarray(np.asarray(life.board, dtype=np.uint8))
+
+
+def _resize(life: Life, num_rows: int, num_cols: int) -> None:
+    # an empty board of the size of the snapshot
+    if (life.num_rows, life.num_cols) == (num_rows, num_cols):
+        life.clear_board()
+    elif isinstance(life, (NumpyLife, BitLife)):
+        life.set_board_state(np.zeros((num_rows, num_cols), dtype=np.uint8))
+    else:
+        life.set_board_state([[0] * num_cols for _ in range(num_rows)])
+
+
+def _load_cells(life: Life, path: str, header: SnapshotHeader) -> None:
+    cells = np.fromfile(path, dtype='<i8', count=header.num_cells * 2, offset=header.offset).reshape(-1, 2)
+
+    if getattr(life, 'unbounded', False):
+        # only the window changes size
+        life.num_rows, life.num_cols = header.num_rows, header.num_cols
+        life.clear_board()
+    else:
+        _resize(life, header.num_rows, header.num_cols)
+        # cells of an unbounded snapshot can be outside of the board
+        inside = (
+            (cells[:, 0] >= 0) & (cells[:, 0] < life.num_rows) &
+            (cells[:, 1] >= 0) & (cells[:, 1] < life.num_cols)
+        )
+        cells = cells[inside]
+
+    if len(cells):
+        life._make_live(cells.tolist() if not isinstance(life, NumpyLife) else cells, 0, 0)
+
+
+def _load_bits(life: Life, path: str, header: SnapshotHeader) -> None:
+    shape = (header.num_rows, (header.num_cols + 63) // 64)
+
+    if type(life) is BitLife and header.num_rows and header.num_cols:
+        # the words are mapped from the file, pages are only copied when they are written
+        life.num_rows, life.num_cols = header.num_rows, header.num_cols
+        life.words = np.memmap(path, dtype='<u8', mode='c', offset=header.offset, shape=shape)
+        life._tail_mask = life._make_tail_mask(life.num_cols)
+        life._board = None
+        life._allocate_buffers()
+        return
+
+    words = np.fromfile(path, dtype='<u8', count=shape[0] * shape[1], offset=header.offset).reshape(shape)
+    _set_dense(life, unpack_rows(words, header.num_cols))
+
+
+def _load_bytes(life: Life, path: str, header: SnapshotHeader) -> None:
+    shape = (header.num_rows, header.num_cols)
+
+    if type(life) is NumpyLife and header.num_rows and header.num_cols:
+        life.num_rows, life.num_cols = shape
+        life.board = np.memmap(path, dtype=np.uint8, mode='c', offset=header.offset, shape=shape)
+        life._allocate_buffers()
+        return
+
+    board = np.fromfile(path, dtype=np.uint8, count=shape[0] * shape[1], offset=header.offset).reshape(shape)
+    _set_dense(life, board)
+
+
+def _set_dense(life: Life, board: np.ndarray) -> None:
+    if isinstance(life, (NumpyLife, BitLife)):
+        life.set_board_state(board)
+    else:
+        life.set_board_state(board.tolist())
@@ -0,0 +1,345 @@
+'''
+runs many random soups to stability at once and counts the objects they leave behind.
+
+BatchLife steps a stack of K boards, a (K, rows, cols) array, with the same whole-array
+operations as NumpyLife. after every generation each board is hashed and compared with its
+hashes of the last max_period generations; a board that repeats (or dies out) is retired
+from the stack, so the stack only holds the boards that still change.
+
+search() spreads batches of soups over worker processes and yields one result per soup.
+from the command line the results are written as JSON lines:
+
+    python soup_search.py --soups 100000 --workers 8 > soups.jsonl
+'''
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from numpy_life import live_cells_of, neighbour_counts, next_generation
+from rules import CONWAY, Rule, parse_rule
+from pattern_io import PATTERNS_DIR, read_pattern
+from sparse_life import NEIGHBOUR_OFFSETS, SparseLife
+
+Cells = List[Tuple[int, int]]
+
+
+class Retired(NamedTuple):
+    # a board that left the stack: its index in the stack it was created with, the board,
+    # the generation its cycle started at and the period (0 if it died out, None if it
+    # was still changing after max_generations)
+    index: int
+    board: np.ndarray
+    generation: int
+    period: Optional[int]
+
+
+class BatchLife:
+
+    def __init__(self, boards: np.ndarray, max_period: int=30, seed: int=0, rule: Union[str, Rule]=CONWAY):
+        boards = np.asarray(boards, dtype=np.uint8)
+        num_boards, num_rows, num_cols = boards.shape
+        self.max_period = max_period
+        self.rule = parse_rule(rule)
+        self.generation = 0
+
+        # two stacks, the active boards are the first len(self.indexes) of one of them.
+        # the boards are stepped in place, so the first one is a copy, never the caller's array
+        self._buffers = [np.array(boards, dtype=np.uint8, copy=True), np.empty_like(boards)]
+        self._counts = np.empty_like(boards)
+        self._current = 0
+        self.indexes = np.arange(num_boards)
+
+        # a board is hashed as the sum of its cells, 8 at a time, times random odd weights
+        self._padding = -(num_rows * num_cols) % 8
+        num_words = (num_rows * num_cols + self._padding) // 8
+        weights = np.random.default_rng(seed).integers(0, 2**63, num_words, dtype=np.uint64)
+        self._weights = weights * np.uint64(2) + np.uint64(1)
+
+        # hash of generation g of every board is in column g % max_period
+        self._history = np.zeros((num_boards, max_period), dtype=np.uint64)
+        self._history[:, 0] = self._hash(self.boards)
+
+    @property
+    def boards(self) -> np.ndarray:
+        # the boards that are still in the stack, in the order of self.indexes
+        return self._buffers[self._current][:len(self.indexes)]
+
+    def compute_next_state(self) -> List[Retired]:
+        # steps every board in the stack and returns the ones that stabilized in this generation
+        count = len(self.indexes)
+        boards = self.boards
+        next_boards = self._buffers[1 - self._current][:count]
+
+        counts = neighbour_counts(live_cells_of(boards, self.rule), self._counts[:count])
+        next_generation(boards, counts, next_boards, self.rule)
+        self._current = 1 - self._current
+        self.generation += 1
+
+        hashes = self._hash(next_boards)
+        column = self.generation % self.max_period
+        # how many generations ago each column was written, only columns of generation >= 0 count
+        ages = (self.generation - np.arange(self.max_period)) % self.max_period
+        ages[ages == 0] = self.max_period
+        ages = np.where(ages <= self.generation, ages, 0)
+
+        matches = (self._history[:count] == hashes[:, None]) & (ages > 0)
+        periods = np.where(matches, ages, self.max_period + 1).min(axis=1)
+        periods[periods > self.max_period] = 0
+        self._history[:count, column] = hashes
+
+        # a hash of 0 is almost surely an empty board, but make sure
+        empty = hashes == 0
+        if empty.any():
+            empty[empty] = ~next_boards[empty].any(axis=(1, 2))
+
+        done = (periods > 0) | empty
+        if not done.any():
+            return []
+
+        retired = [
+            Retired(
+                int(self.indexes[k]),
+                next_boards[k].copy(),
+                self.generation - (0 if empty[k] else int(periods[k])),
+                0 if empty[k] else int(periods[k]),
+            )
+            for k in np.flatnonzero(done)
+        ]
+        self._keep(~done)
+        return retired
+
+    def retire_all(self) -> List[Retired]:
+        # the boards that didn't stabilize
+        retired = [
+            Retired(int(index), board.copy(), self.generation, None)
+            for index, board in zip(self.indexes, self.boards)
+        ]
+        self._keep(np.zeros(len(self.indexes), dtype=bool))
+        return retired
+
+    def _keep(self, keep: np.ndarray) -> None:
+        # moves the boards that stay to the front of the other buffer
+        count = int(keep.sum())
+        self._buffers[1 - self._current][:count] = self.boards[keep]
+        self._history[:count] = self._history[:len(keep)][keep]
+        self.indexes = self.indexes[keep]
+        self._current = 1 - self._current
+
+    def _hash(self, boards: np.ndarray) -> np.ndarray:
+        cells = boards.reshape(len(boards), -1)
+        if self._padding:
+            cells = np.pad(cells, ((0, 0), (0, self._padding)))
+        words = np.ascontiguousarray(cells).view(np.uint64)
+        # uint64 arithmetic wraps around, that's the point
+        return words @ self._weights
+
+
+# census
+
+def connected_objects(cells: Cells) -> List[Cells]:
+    # groups the cells into objects, cells that touch (also diagonally) are in the same object
+    remaining = set(cells)
+    objects = []
+    while remaining:
+        stack = [remaining.pop()]
+        cells_of_object = []
+        while stack:
+            i, j = stack.pop()
+            cells_of_object.append((i, j))
+            for di, dj in NEIGHBOUR_OFFSETS:
+                neighbour = (i + di, j + dj)
+                if neighbour in remaining:
+                    remaining.remove(neighbour)
+                    stack.append(neighbour)
+        objects.append(cells_of_object)
+    return objects
+
+
+def canonical_form(cells: Cells) -> Tuple[Tuple[int, int], ...]:
+    # the same for an object in any position, rotation or reflection
+    forms = []
+    for transform in _D4:
+        moved = [transform(i, j) for i, j in cells]
+        top = min(i for i, _ in moved)
+        left = min(j for _, j in moved)
+        forms.append(tuple(sorted((i - top, j - left) for i, j in moved)))
+    return min(forms)
+
+
+def object_name(cells: Cells, max_period: int=30, rule: Rule=CONWAY) -> str:
+    # the name of the pattern in the patterns directory, or a made up code from the period of
+    # the object on its own: xs6_1f2a3b4c for a still life, xp2_... for an oscillator
+    form = canonical_form(cells)
+    known_objects = _known_objects(rule)
+    name = known_objects.get(form)
+    if name is not None:
+        return name
+
+    life = SparseLife(unbounded=True, rule=rule)
+    life._make_live(list(form), 0, 0)
+    period = None
+    for generation in range(1, max_period + 1):
+        life.compute_next_state()
+        if set(life.live_cells()) == set(form):
+            period = generation
+            break
+
+    digest = hashlib.sha1(repr(form).encode()).hexdigest()[:8]
+    if period is None:
+        # only stable together with other objects
+        prefix = 'xx'
+    elif period == 1:
+        prefix = 'xs'
+    else:
+        prefix = f'xp{period}_'
+    name = f'{prefix}{len(cells)}_{digest}'
+    known_objects[form] = name
+    return name
+
+
+def census(board: np.ndarray, rule: Rule=CONWAY) -> Dict[str, int]:
+    # objects on the board by name. the dying cells of Generations rules are not part of objects
+    rows, cols = np.nonzero(board == 1)
+    counts: Dict[str, int] = {}
+    for cells in connected_objects(list(zip(rows.tolist(), cols.tolist()))):
+        name = object_name(cells, rule=rule)
+        counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+_D4 = [
+    lambda i, j: (i, j),
+    lambda i, j: (j, -i),
+    lambda i, j: (-i, -j),
+    lambda i, j: (-j, i),
+    lambda i, j: (i, -j),
+    lambda i, j: (-i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (-j, -i),
+]
+# by rule: canonical form -> name
+_KNOWN_OBJECTS: Dict[Rule, Dict[Tuple[Tuple[int, int], ...], str]] = {}
+
+
+def _known_objects(rule: Rule) -> Dict[Tuple[Tuple[int, int], ...], str]:
+    # for the Game of Life, the canonical form of every phase of the patterns in the patterns directory.
+    # plus the objects named by object_name() so far
+    if rule not in _KNOWN_OBJECTS:
+        _KNOWN_OBJECTS[rule] = {}
+        if rule == CONWAY:
+            for file_name in sorted(os.listdir(PATTERNS_DIR)):
+                name, _ = os.path.splitext(file_name)
+                life = SparseLife(unbounded=True)
+                life._make_live(list(read_pattern(os.path.join(PATTERNS_DIR, file_name))), 0, 0)
+                for _ in range(30):
+                    if life.live and len(connected_objects(life.live_cells())) == 1:
+                        _KNOWN_OBJECTS[rule].setdefault(canonical_form(life.live_cells()), name)
+                    life.compute_next_state()
+    return _KNOWN_OBJECTS[rule]
+
+
+# search
+
+def random_soups(seed: int, batch: int, num_soups: int, board_size: int, soup_size: int, density: float) -> np.ndarray:
+    # num_soups boards with a random soup_size x soup_size square in the middle.
+    # the same (seed, batch) always gives the same soups
+    rng = np.random.default_rng([seed, batch])
+    boards = np.zeros((num_soups, board_size, board_size), dtype=np.uint8)
+    start = (board_size - soup_size) // 2
+    boards[:, start:start + soup_size, start:start + soup_size] = rng.random((num_soups, soup_size, soup_size)) < density
+    return boards
+
+
+def search_batch(seed: int, batch: int, num_soups: int, board_size: int=64, soup_size: int=16,
+                 density: float=0.5, max_generations: int=5000, max_period: int=30, rule: str='B3/S23') -> List[dict]:
+    # runs one batch of soups to stability, a result per soup in the order of the soups
+    rule = parse_rule(rule)
+    life = BatchLife(random_soups(seed, batch, num_soups, board_size, soup_size, density), max_period, seed, rule)
+
+    retired = []
+    while len(life.indexes) and life.generation < max_generations:
+        retired += life.compute_next_state()
+    retired += life.retire_all()
+
+    results = []
+    for soup in sorted(retired):
+        result = {
+            'seed': seed,
+            'batch': batch,
+            'soup': soup.index,
+            'generation': soup.generation,
+            'period': soup.period,
+            'population': int(np.count_nonzero(soup.board == 1)),
+        }
+        if soup.period is None:
+            result['status'] = 'unstable'
+        elif soup.period == 0:
+            result['status'] = 'extinct'
+        else:
+            result['status'] = 'stable'
+            result['census'] = census(soup.board, rule)
+        results.append(result)
+    return results
+
+
+def search(num_soups: int, batch_size: int=1000, workers: Optional[int]=None, seed: int=0, **kwargs) -> Iterator[dict]:
+    # yields the results of num_soups soups, batch by batch as the workers finish them.
+    # kwargs go to search_batch()
+    num_batches = -(-num_soups // batch_size)
+    sizes = [min(batch_size, num_soups - batch * batch_size) for batch in range(num_batches)]
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = [
+            pool.submit(search_batch, seed, batch, size, **kwargs)
+            for batch, size in enumerate(sizes)
+        ]
+        for future in futures:
+            yield from future.result()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='run random soups to stability and count what they leave behind')
+    parser.add_argument('--soups', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--board-size', type=int, default=64, help='the soups run on a board of this size, dead outside')
+    parser.add_argument('--soup-size', type=int, default=16)
+    parser.add_argument('--density', type=float, default=0.5)
+    parser.add_argument('--max-generations', type=int, default=5000)
+    parser.add_argument('--max-period', type=int, default=30, help='longest period that counts as stable')
+    parser.add_argument('--rule', default='B3/S23', help='rule string like B36/S23, see rules.py')
+    parser.add_argument('--output', help='JSON lines file, stdout by default')
+    args = parser.parse_args()
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    start = time.perf_counter()
+    count = 0
+    try:
+        for result in search(
+            args.soups, args.batch_size, args.workers, args.seed,
+            board_size=args.board_size, soup_size=args.soup_size, density=args.density,
+            max_generations=args.max_generations, max_period=args.max_period, rule=args.rule,
+        ):
+            output.write(json.dumps(result) + '\n')
+            count += 1
+            if count % args.batch_size == 0:
+                output.flush()
+                print(f'{count} soups, {count / (time.perf_counter() - start):.1f} soups/s', file=sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f'{count} soups in {time.perf_counter() - start:.1f} s, '
+          f'{count / (time.perf_counter() - start):.1f} soups/s', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+from collections import Counter
+from typing import Dict, List, Set, Tuple, Union
+
+from boundary import cell_image
+from life_game import Life
+from life_stats import LifeStats, cells_bounding_box
+from rules import CONWAY, Rule
+
+# offsets of the 8 neighbours of a cell
+NEIGHBOUR_OFFSETS = [
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1), (0, 1),
+    (1, -1), (1, 0), (1, 1),
+]
+
+
+class SparseLife(Life):
+    # stores only the coordinates of live cells, so memory and time per generation
+    # depend on the population instead of the area of the board.
+    #
+    # by default the board is bounded by num_rows x num_cols with dead cells outside,
+    # like Life. with unbounded=True the cells live on an infinite plane and num_rows x num_cols
+    # is just the window returned by get_board()
+
+    def __init__(self, num_rows: int=0, num_cols: int=0, unbounded: bool=False, rule: Union[str, Rule]=CONWAY,
+                 boundary: str='dead'):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.unbounded = unbounded
+        self.generation = 0
+        self.rule = rule
+        self.boundary = boundary
+
+        self.live: Set[Tuple[int, int]] = set()
+        # state of the dying cells of Generations rules
+        self._dying: Dict[Tuple[int, int], int] = {}
+        # cells born or died in the last generation
+        self._changed: Set[Tuple[int, int]] = set()
+
+    @property
+    def board(self) -> List[List[int]]:
+        # dense view of the window (0, 0) - (num_rows, num_cols), built on every access
+        board = [
+            [0] * self.num_cols for _ in range(self.num_rows)
+        ]
+        for i, j in self.live:
+            if 0 <= i < self.num_rows and 0 <= j < self.num_cols:
+                board[i][j] = 1
+        for (i, j), state in self._dying.items():
+            if 0 <= i < self.num_rows and 0 <= j < self.num_cols:
+                board[i][j] = state
+        return board
+
+    def clear_board(self) -> None:
+        self.live.clear()
+        self._dying.clear()
+        self._changed.clear()
+
+    def set_board_state(self, board: List[List[int]]) -> None:
+        self.num_rows = len(board)
+        self.num_cols = len(board[0])
+
+        self.live = {
+            (i, j)
+            for i, row in enumerate(board)
+            for j, value in enumerate(row)
+            if value == 1
+        }
+        self._dying = {
+            (i, j): value
+            for i, row in enumerate(board)
+            for j, value in enumerate(row)
+            if value > 1
+        }
+        # the changes of the last generation were on the old board
+        self._changed.clear()
+
+    def get_board(self) -> List[List[int]]:
+        return self.board
+
+    def live_cells(self) -> List[Tuple[int, int]]:
+        return list(self.live)
+
+    def changed_cells(self) -> List[Tuple[int, int]]:
+        return list(self._changed)
+
+    @property
+    def stats(self) -> LifeStats:
+        live = self.live
+        births = sum(1 for cell in self._changed if cell in live)
+        return LifeStats(self.generation, len(live), births, len(self._changed) - births, cells_bounding_box(live))
+
+    def compute_next_state(self) -> None:
+        # only cells next to a live cell can have neighbours, so count around the live cells
+        counts = Counter(
+            (i + di, j + dj)
+            for i, j in self.live
+            for di, dj in NEIGHBOUR_OFFSETS
+        )
+        if self.boundary != 'dead':
+            self._fold_halo(counts)
+
+        birth, survival = self.rule.birth, self.rule.survival
+        live = self.live
+        dying = self._dying
+        self.live = {
+            cell
+            for cell, num_neighbours in counts.items()
+            if (num_neighbours in survival if cell in live else num_neighbours in birth and cell not in dying)
+        }
+        if 0 in survival:
+            # live cells without neighbours are not counted above
+            self.live.update(cell for cell in live if cell not in counts)
+
+        if self.rule.states > 2:
+            # live cells that don't survive start dying, the dying ones get one state closer to dead
+            states = self.rule.states
+            self._dying = {cell: state + 1 for cell, state in dying.items() if state + 1 < states}
+            self._dying.update((cell, 2) for cell in live - self.live)
+
+        if not self.unbounded:
+            self._drop_outside()
+
+        self._changed = live ^ self.live
+        self.generation += 1
+        self._record_stats()
+
+    def _make_live(self, cells: List[Tuple[int, int]], i: int, j: int) -> None:
+        cells = [(i + cell[0], j + cell[1]) for cell in cells]
+        self.live.update(cells)
+        for cell in cells if self._dying else []:
+            self._dying.pop(cell, None)
+
+        if not self.unbounded:
+            self._drop_outside()
+
+    def _check_rule(self, rule: Rule) -> None:
+        if 0 in rule.birth:
+            raise ValueError(f'{rule}: cells with no neighbours are born, every cell of the plane would be alive')
+
+    def _check_boundary(self, boundary: str) -> None:
+        if boundary != 'dead' and self.unbounded:
+            raise ValueError(f"an unbounded plane has no edges to be '{boundary}'")
+
+    def _fold_halo(self, counts: Counter) -> None:
+        # the cells just outside of the board stand for cells on its edges (see boundary.py),
+        # their counts are added to the counts of those cells
+        rows, cols = self.num_rows, self.num_cols
+        outside = [
+            cell for cell in counts
+            if not (0 <= cell[0] < rows and 0 <= cell[1] < cols)
+        ]
+        for cell in outside:
+            num_neighbours = counts.pop(cell)
+            image = cell_image(cell[0], cell[1], rows, cols, self.boundary)
+            if image is not None:
+                counts[image] += num_neighbours
+
+    def _drop_outside(self) -> None:
+        # a bounded board keeps every cell outside of it dead
+        rows, cols = self.num_rows, self.num_cols
+        outside = [
+            (i, j) for i, j in self.live
+            if not (0 <= i < rows and 0 <= j < cols)
+        ]
+        self.live.difference_update(outside)
+        for cell in [cell for cell in self._dying if not (0 <= cell[0] < rows and 0 <= cell[1] < cols)]:
+            del self._dying[cell]
@@ -0,0 +1,143 @@
+'''
+on-disk cache of simulated generations.
+
+a timeline is keyed by everything that decides how a board evolves: the engine, the size of the board,
+the rule and the boundary, the live cells at the start and the number of generations. it is stored as the cells that
+changed in every generation plus the final live cells, compressed, one file per timeline.
+the least recently used timelines are deleted when the cache grows over max_bytes.
+a timeline that stopped early because the board stabilized also keeps how it stabilized.
+only the live cells are kept, so the boards of Generations rules, with dying cells, are not cached.
+'''
+import hashlib
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from cycle_detection import STABILIZATION_KINDS, Stabilization
+from life_game import Life
+
+Cells = List[Tuple[int, int]]
+
+
+class Timeline:
+    def __init__(self, changes: List[Cells], final_cells: Cells, stabilization: Optional[Stabilization]=None):
+        # changes[k] are the cells that were born or died going from generation k to k + 1
+        self.changes = changes
+        self.final_cells = final_cells
+        self.stabilization = stabilization
+
+    def restore(self, life: Life) -> None:
+        # puts the last generation of the timeline on the board, as if it was simulated
+        life.clear_board()
+        if self.final_cells:
+            life._make_live(self.final_cells, 0, 0)
+        life.generation += len(self.changes)
+
+
+class TimelineCache:
+
+    def __init__(self, directory: str, max_bytes: int=256 * 2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def can_cache(life: Life) -> bool:
+        # the dying cells of Generations rules aren't in the timelines
+        return life.rule.states == 2
+
+    @staticmethod
+    def key(life: Life, num_generations: int, stop_when_stable: bool=False) -> str:
+        cells = np.array(sorted(life.live_cells()), dtype=np.int64)
+
+        h = hashlib.sha256()
+        h.update(type(life).__name__.encode())
+        h.update(repr((
+            life.num_rows,
+            life.num_cols,
+            getattr(life, 'unbounded', False),
+            str(life.rule),
+            life.boundary,
+            num_generations,
+        )).encode())
+        if stop_when_stable:
+            # a run that stops early is another timeline
+            h.update(b'stop_when_stable')
+        h.update(cells.tobytes())
+        return h.hexdigest()
+
+    def load(self, key: str) -> Optional[Timeline]:
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                coords = data['coords'].tolist()
+                offsets = data['offsets'].tolist()
+                final_cells = [tuple(cell) for cell in data['final'].tolist()]
+                stabilization = None
+                if 'stabilization' in data:
+                    kind, generation, period = data['stabilization'].tolist()
+                    stabilization = Stabilization(STABILIZATION_KINDS[kind], generation, period)
+        except FileNotFoundError:
+            # never saved, or deleted by the eviction of another process
+            return None
+
+        changes = [
+            [tuple(cell) for cell in coords[offsets[k]:offsets[k + 1]]]
+            for k in range(len(offsets) - 1)
+        ]
+
+        # mark as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return Timeline(changes, final_cells, stabilization)
+
+    def save(self, key: str, timeline: Timeline) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+
+        offsets = np.cumsum([0] + [len(cells) for cells in timeline.changes])
+        coords = [cell for cells in timeline.changes for cell in cells]
+
+        # written under another name first, so a crash never leaves a broken timeline behind.
+        # the name is the process', render_sections.py runs several renders on the same cache
+        arrays = {
+            'coords': np.array(coords, dtype=np.int32).reshape(-1, 2),
+            'offsets': offsets.astype(np.int64),
+            'final': np.array(timeline.final_cells, dtype=np.int32).reshape(-1, 2),
+        }
+        if timeline.stabilization is not None:
+            kind, generation, period = timeline.stabilization
+            arrays['stabilization'] = np.array([STABILIZATION_KINDS.index(kind), generation, period], dtype=np.int64)
+
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+        self._evict()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.npz')
+
+    def _evict(self) -> None:
+        # delete the least recently used timelines until the cache fits in max_bytes.
+        # another process may be deleting the same timelines
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz') and not entry.name.endswith('.tmp.npz'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size